@@ -1,10 +1,28 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
+from sqlalchemy import event
 from pathlib import Path  # Local import to avoid polluting module scope at import time
 
 db = SQLAlchemy()
 ma = Marshmallow()
 
+def use_sqlite_pragmas(engine):
+    """Switch every new SQLite connection of *engine* to WAL + synchronous=NORMAL.
+
+    Seeding and the batch scripts commit many small transactions, and in the
+    default rollback-journal mode every one of them fsyncs the database file.
+    Engines for other databases are left untouched.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
 def init_db(app):
     """Initialize the database with the Flask app."""
     # ------------------------------------------------------------------
@@ -28,6 +46,8 @@ def init_db(app):
     ma.init_app(app)
     
     with app.app_context():
+        use_sqlite_pragmas(db.engine)
+
         # Ensure *all* model classes are imported so their tables are present
         # in SQLAlchemy metadata before we call ``create_all``.  Omitting an
         # import here means the corresponding table will NOT be created and
@@ -1,6 +1,21 @@
 import numpy as np
 from datetime import datetime
 
+
+def _present_value(rate, future_value, years_from_now):
+    """Discount *future_value* by *years_from_now* years at *rate*.
+
+    Plain arithmetic, so it works on Python floats and NumPy arrays alike.
+    """
+    return future_value / ((1 + rate) ** years_from_now)
+
+
+def _annuity_present_value(rate, annual_amount, years, start_year):
+    """Present value of *years* payments of *annual_amount* starting in *start_year*."""
+    pv_at_start = annual_amount * (1 - (1 + rate) ** -years) / rate
+    return _present_value(rate, pv_at_start, start_year)
+
+
 class DCFCalculator:
     """Service for performing discounted cash flow calculations."""
     
@@ -28,7 +43,25 @@ class DCFCalculator:
         Returns:
             float: Present value of the future amount
         """
-        return future_value / ((1 + self.discount_rate) ** years_from_now)
+        return _present_value(self.discount_rate, future_value, years_from_now)
+    
+    def calculate_present_value_vec(self, future_values, years_from_now):
+        """
+        Vectorised :meth:`calculate_present_value` for many amounts at once.
+        
+        Args:
+            future_values (array-like): Future amounts
+            years_from_now (array-like): Years until each amount is needed
+                (broadcast against *future_values*)
+            
+        Returns:
+            np.ndarray: Present value of each amount
+        """
+        return _present_value(
+            self.discount_rate,
+            np.asarray(future_values, dtype=float),
+            np.asarray(years_from_now, dtype=float),
+        )
     
     def calculate_annuity_present_value(self, annual_amount, years, start_year):
         """
@@ -42,11 +75,29 @@ class DCFCalculator:
         Returns:
             float: Present value of the annuity
         """
-        # Calculate the present value of the annuity at the start date
-        pv_at_start = annual_amount * (1 - (1 + self.discount_rate) ** -years) / self.discount_rate
+        return _annuity_present_value(self.discount_rate, annual_amount, years, start_year)
+    
+    def calculate_annuity_present_value_vec(self, annual_amounts, years, start_years):
+        """
+        Vectorised :meth:`calculate_annuity_present_value`.
         
-        # Discount back to present value
-        return pv_at_start / ((1 + self.discount_rate) ** start_year)
+        Uses the same closed-form geometric series, so a batch of annuities is
+        a handful of array operations instead of one Python call each.
+        
+        Args:
+            annual_amounts (array-like): Annual payment amounts
+            years (array-like): Number of years each annuity will last
+            start_years (array-like): Number of years until each annuity starts
+            
+        Returns:
+            np.ndarray: Present value of each annuity (inputs are broadcast)
+        """
+        return _annuity_present_value(
+            self.discount_rate,
+            np.asarray(annual_amounts, dtype=float),
+            np.asarray(years, dtype=float),
+            np.asarray(start_years, dtype=float),
+        )
     
     def calculate_retirement_needs(self, monthly_income, retirement_age, life_expectancy):
         """
@@ -19,10 +19,14 @@ rest of the code-base.
 
 from __future__ import annotations
 
+from dataclasses import dataclass, fields
+from datetime import datetime
 from typing import Dict, Iterable, List
 
 from flask import Flask, current_app, has_app_context
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, sessionmaker
 
 # ---------------------------------------------------------------
@@ -44,11 +48,49 @@ from backend.app.models.goal import Goal  # type: ignore
 from backend.app.models.scenario_parameter_value import ScenarioParameterValue  # type: ignore
 from backend.app.models.solved_parameter_value import SolvedParameterValue  # type: ignore
 
-from backend.app.database import db  # type: ignore  # SQLAlchemy() instance that defines `metadata`
+from backend.app.database import db, use_sqlite_pragmas  # type: ignore  # SQLAlchemy() instance that defines `metadata`
 from backend.app import create_app
 
 # ---------------------------------------------------------------
-# 2. Low-level DB helpers
+# 2. Lightweight read-only records
+# ---------------------------------------------------------------
+@dataclass(slots=True, frozen=True)
+class MilestoneRow:
+    """Plain, read-only copy of the :class:`Milestone` columns used by the DCF scripts.
+
+    Attribute access is a direct slot load rather than an ORM descriptor call, and the
+    records pickle cheaply across processes.  Field names match the ORM attributes so
+    the rows can be used wherever a milestone is only *read*.
+    """
+
+    id: int
+    scenario_id: int
+    sub_scenario_id: int
+    name: str | None
+    milestone_type: str | None
+    disbursement_type: str | None
+    age_at_occurrence: int | None
+    amount: float | None
+    payment: float | None
+    amount_value_type: str | None
+    occurrence: str | None
+    duration: int | None
+    rate_of_return: float | None
+    duration_end_at_milestone: str | None
+    start_after_milestone: str | None
+
+
+_MILESTONE_ROW_COLUMNS = [getattr(Milestone, f.name) for f in fields(MilestoneRow)]
+
+# Dialect-specific INSERT constructs that support ON CONFLICT … DO UPDATE
+UPSERT_INSERT = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+# ---------------------------------------------------------------
+# 3. Low-level DB helpers
 # ---------------------------------------------------------------
 class DBConnector:
     def __init__(self):
@@ -105,11 +147,12 @@ class DBConnector:
             from flask import current_app  # late import to keep module-level deps minimal
 
             engine = create_engine(current_app.config["SQLALCHEMY_DATABASE_URI"])
+            use_sqlite_pragmas(engine)
             self._SessionFactory = sessionmaker(bind=engine)
         return self._SessionFactory()
 
     # ---------------------------------------------------------------------------
-    # 3. Data retrieval helpers
+    # 4. Data retrieval helpers
     # ---------------------------------------------------------------------------
 
     def fetch_all_data(self, session: Session, *, scenario_id: int | None = None) -> Dict[str, List]:
@@ -150,8 +193,32 @@ class DBConnector:
         }
         return data
 
+    def scenario_sub_pairs(self, session: Session) -> List[tuple[int, int]]:
+        """Return every distinct ``(scenario_id, sub_scenario_id)`` pair that has milestones.
+
+        The de-duplication happens in the database (``SELECT DISTINCT``) rather than by
+        loading the whole milestones table.
+        """
+
+        stmt = select(Milestone.scenario_id, Milestone.sub_scenario_id).distinct()
+        return [tuple(row) for row in session.execute(stmt)]
+
+    def fetch_milestones(self, session: Session, scenario_id: int, sub_scenario_id: int) -> List[MilestoneRow]:
+        """Return only the milestones of one *scenario_id* / *sub_scenario_id* pair.
+
+        Lets a single-pair projection filter in SQL instead of pulling the whole milestones
+        table through :func:`fetch_all_data` and discarding most of it in Python.  The rows
+        come back as read-only :class:`MilestoneRow` records, not ORM objects.
+        """
+
+        stmt = select(*_MILESTONE_ROW_COLUMNS).where(
+            Milestone.scenario_id == scenario_id,
+            Milestone.sub_scenario_id == sub_scenario_id,
+        )
+        return [MilestoneRow(*row) for row in session.execute(stmt)]
+
     # ---------------------------------------------------------------------------
-    # 4. Persistence helpers
+    # 5. Persistence helpers
     # ---------------------------------------------------------------------------
 
     def upsert_solved_parameter_values(self, session: Session, records: Iterable[dict]) -> None:
@@ -176,28 +243,17 @@ class DBConnector:
         ... ])
         """
 
-        for rec in records:
-            # Try to find an existing row that matches the unique constraint
-            obj = (
-                session.query(SolvedParameterValue)
-                .filter_by(
-                    milestone_id=rec["milestone_id"],
-                    goal_parameter=rec["goal_parameter"],
-                    scenario_parameter=rec["scenario_parameter"],
-                    scenario_value=rec["scenario_value"],
-                )
-                .first()
-            )
+        allowed_keys = {c.name for c in SolvedParameterValue.__table__.columns}
+        rows = [{k: v for k, v in rec.items() if k in allowed_keys} for rec in records]
 
-            if obj is None:
-                # Cast to proper kwargs (ignore surplus keys)
-                allowed_keys = {c.name for c in SolvedParameterValue.__table__.columns}
-                kwargs = {k: v for k, v in rec.items() if k in allowed_keys}
-                obj = SolvedParameterValue(**kwargs)  # type: ignore[arg-type]
-            else:
-                obj.solved_value = rec["solved_value"]
-
-            session.add(obj)
+        # One INSERT … ON CONFLICT on the unique constraint, executed for the whole batch
+        if rows:
+            stmt = UPSERT_INSERT[session.get_bind().dialect.name](SolvedParameterValue.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["milestone_id", "goal_parameter", "scenario_parameter", "scenario_value"],
+                set_={"solved_value": stmt.excluded.solved_value, "updated_at": datetime.utcnow()},
+            )
+            session.execute(stmt, rows)
 
         session.commit()
 
@@ -207,24 +263,33 @@ class DBConnector:
         Expected *record* keys: ``milestone_id``, ``age``, ``value``.
         """
 
-        for rec in records:
-            obj = (
-                session.query(MilestoneValueByAge)
-                .filter_by(milestone_id=rec["milestone_id"], age=rec["age"])
-                .first()
-            )
-
-            if obj is None:
-                obj = MilestoneValueByAge(**rec)  # type: ignore[arg-type]
-            else:
-                obj.value = rec["value"]
-
-            session.add(obj)
+        # (milestone_id, age) has no unique constraint to upsert against, so look up
+        # the existing rows in one query and split the batch into inserts and updates
+        values = {(rec["milestone_id"], rec["age"]): rec["value"] for rec in records}
 
+        key = tuple_(MilestoneValueByAge.milestone_id, MilestoneValueByAge.age)
+        existing = {
+            (milestone_id, age): row_id
+            for row_id, milestone_id, age in session.execute(
+                select(MilestoneValueByAge.id, MilestoneValueByAge.milestone_id, MilestoneValueByAge.age)
+                .where(key.in_(list(values)))
+            )
+        } if values else {}
+
+        updates = [{"id": existing[k], "value": v} for k, v in values.items() if k in existing]
+        inserts = [
+            {"milestone_id": k[0], "age": k[1], "value": v}
+            for k, v in values.items()
+            if k not in existing
+        ]
+        if updates:
+            session.execute(update(MilestoneValueByAge), updates)
+        if inserts:
+            session.execute(insert(MilestoneValueByAge), inserts)
         session.commit()
 
 # ---------------------------------------------------------------------------
-# 5. Quick smoke test when executed as a script
+# 6. Quick smoke test when executed as a script
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
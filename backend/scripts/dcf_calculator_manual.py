@@ -2,10 +2,20 @@
 # --------------------------------------------------------------------
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict
+from functools import lru_cache
+from typing import Callable, List, Dict
 import math
+import numpy as np
 import pandas as pd
 
+try:  # optional JIT for the yearly recurrence – pure Python otherwise
+    from numba import njit
+except ImportError:  # pragma: no cover - depends on the environment
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
 
 # ────────────────────────────────────────────────────────────────────
 #  Core assumptions
@@ -74,6 +84,118 @@ class GrowingSeries:
 
         return self.initial_value * (1 + self.growth_rate) ** rel_step
 
+    def values(self, steps: np.ndarray) -> np.ndarray:
+        """Vectorised :meth:`value_at` over an array of *steps*."""
+
+        rel = steps - self.start_step
+        active = rel >= 0
+        if self.duration is not None:
+            active &= rel < self.duration
+        # clip so inactive slots never raise (e.g. growth of -100 % to a negative power)
+        grown = self.initial_value * (1 + self.growth_rate) ** np.maximum(rel, 0)
+        return np.where(active, grown, 0.0)
+
+
+def project_series(streams: List[GrowingSeries], n_steps: int) -> np.ndarray:
+    """Total of all *streams* for steps ``0 … n_steps-1`` as one float array.
+
+    Streams are added in list order so the result matches summing
+    :meth:`GrowingSeries.value_at` step by step.
+    """
+
+    steps = np.arange(max(n_steps, 0))
+    total = np.zeros(len(steps))
+    for stream in streams:
+        total += stream.values(steps)
+    return total
+
+
+@njit(cache=True)
+def _project_core(
+    initial_assets,
+    rate_of_return,
+    asset_events,
+    salary,
+    expenses,
+    loan_step,
+    loan_principal,
+    loan_rate,
+    loan_payment,
+    loan_interest_only,
+):
+    """Year-by-year projection on preallocated float arrays.
+
+    Loans are passed structure-of-arrays style (one entry per loan, in the
+    order they become active) and follow :class:`AmortisingLoan` semantics:
+    interest-only loans pay interest forever, amortising loans pay their fixed
+    payment, and a loan drops out once its principal is (numerically) repaid.
+
+    Returns ``(assets_begin, assets_income, liabilities_begin,
+    liabilities_expense, assets_end, liabilities_end)``.
+    """
+    n = asset_events.shape[0]
+    n_loans = loan_step.shape[0]
+
+    principal = loan_principal.copy()
+    alive = np.zeros(n_loans, dtype=np.bool_)
+
+    a_begin = np.empty(n)
+    a_income = np.empty(n)
+    l_begin = np.empty(n)
+    l_expense = np.empty(n)
+    a_end = np.empty(n)
+    l_end = np.empty(n)
+
+    prev = initial_assets
+    for t in range(n):
+        # Loans that start this year ------------------------------------
+        for k in range(n_loans):
+            if loan_step[k] == t:
+                alive[k] = True
+
+        owed = 0.0
+        for k in range(n_loans):
+            if alive[k]:
+                owed += principal[k]
+        l_begin[t] = owed
+
+        # Debt service -------------------------------------------------
+        service = 0.0
+        for k in range(n_loans):
+            if not alive[k]:
+                continue
+            p = principal[k]
+            if p > 0:
+                interest = p * loan_rate[k]
+                if loan_interest_only[k]:
+                    service += interest
+                else:
+                    pay = loan_payment[k]
+                    service += pay
+                    repaid = min(max(pay - interest, 0.0), p)
+                    principal[k] = p - repaid
+            if principal[k] <= 1e-8:
+                alive[k] = False
+        l_expense[t] = service
+
+        owed = 0.0
+        for k in range(n_loans):
+            if alive[k]:
+                owed += principal[k]
+        l_end[t] = owed
+
+        # Assets: growth on the beginning balance (after one-off events),
+        # then the year's net saving on top ----------------------------
+        begin = prev + asset_events[t]
+        income = begin * rate_of_return
+        net_saving = salary[t] - expenses[t] - service
+        prev = begin + income + net_saving
+        a_begin[t] = begin
+        a_income[t] = income
+        a_end[t] = prev
+
+    return a_begin, a_income, l_begin, l_expense, a_end, l_end
+
 
 # ────────────────────────────────────────────────────────────────────
 #  Liability helper – amortising loan schedule
@@ -111,6 +233,11 @@ class AmortisingLoan:
         return total_payment, principal_repaid
 
 
+# Integer codes for milestone types in the column layout built by
+# DCFModel.from_milestones (unknown types map to -1)
+_TYPE_CODES = {"Asset": 0, "Income": 1, "Expense": 2, "Liability": 3}
+
+
 # ────────────────────────────────────────────────────────────────────
 #  Main DCF engine
 # ────────────────────────────────────────────────────────────────────
@@ -125,6 +252,33 @@ class DCFModel:
         base_salary, base_expenses
     """
 
+    # Projection table columns, in output order
+    COLUMNS = (
+        "Age",
+        "Beginning Assets",
+        "Assets Income",
+        "Beginning Liabilities",
+        "Liabilities Expense",
+        "Salary",
+        "Expenses",
+    )
+
+    # Milestone attributes read by :meth:`from_milestones`
+    MILESTONE_FIELDS = (
+        "name",
+        "milestone_type",
+        "age_at_occurrence",
+        "amount",
+        "amount_value_type",
+        "payment",
+        "occurrence",
+        "duration",
+        "disbursement_type",
+        "rate_of_return",
+        "duration_end_at_milestone",
+        "start_after_milestone",
+    )
+
     def __init__(
         self,
         *,
@@ -167,7 +321,10 @@ class DCFModel:
         # Detailed loan descriptions coming from milestone parsing
         self._loan_templates: Dict[int, List[tuple]] = liability_templates or {}
 
-        # results populated by run()
+        # results populated by run() – one NumPy array per column; the list
+        # and DataFrame views are only built on demand
+        self._arrays: Dict[str, np.ndarray] | None = None
+        self._columns: Dict[str, List] | None = None
         self._table: pd.DataFrame | None = None
 
     # ─────────────────────── public API ─────────────────────────────
@@ -175,120 +332,128 @@ class DCFModel:
         """Iterate year-by-year to build the projection table."""
 
         years = self.end_age - self.start_age
-        rows: List[Dict] = []
+        n = max(years + 1, 0)
 
-        # ── 1. Initialise loan schedules ───────────────────────────────
-        active_loans: List[AmortisingLoan] = []
+        # ── 1. Loan schedules → one array entry per loan ────────────────
+        loans: List[tuple] = []  # (start_step, principal, rate, payment, interest_only)
 
-        def _make_loan(
+        def _add_loan(
+            step: int,
             principal: float,
             rate: float,
             duration: int | None,
             payment_override: float | None = None,
-        ) -> AmortisingLoan:
-            """Create an *AmortisingLoan* object.
+        ) -> None:
+            """Queue a loan starting at *step* (see :class:`AmortisingLoan`).
 
             When *payment_override* is provided we respect that fixed **annual**
             payment instead of deriving it from the usual annuity formula.  This
             allows us to honour user-entered *monthly* payment figures (×12).
+            Without a *duration* the loan is interest-only.
             """
 
             if payment_override is not None:
-                dur_remaining: int | float = duration if duration is not None else math.inf
-                return AmortisingLoan(principal, rate, dur_remaining, payment_override)
-
-            # ── default behaviour – derive payment from annuity math ──
-            if duration is None:
+                payment = payment_override
+            elif duration is None:
                 payment = principal * rate  # interest-only (per annum)
-                dur_remaining = math.inf
             else:
+                # ── default behaviour – derive payment from annuity math ──
                 payment = (principal * rate) / (1 - (1 + rate) ** (-duration)) if rate else principal / duration
-                dur_remaining = duration
-            return AmortisingLoan(principal, rate, dur_remaining, payment)
+            loans.append((step, principal, rate, payment, duration is None))
 
-        # Loans commencing at the projection start -----------------------
-        for spec in self._loan_templates.get(self.start_age, []):
-            # Support both historic 3-tuple and new 4-tuple including payment
-            if len(spec) == 4:
-                principal, rate_override, duration, pay_override = spec
-            else:
-                principal, rate_override, duration = spec
-                pay_override = None
+        def _add_templates(step: int, age: int) -> None:
+            for spec in self._loan_templates.get(age, []):
+                # Support both historic 3-tuple and new 4-tuple including payment
+                if len(spec) == 4:
+                    principal, rate_override, duration, pay_override = spec
+                else:
+                    principal, rate_override, duration = spec
+                    pay_override = None
 
-            rate = rate_override if rate_override is not None else self.assump.cost_of_debt
-            active_loans.append(_make_loan(principal, rate, duration, pay_override))
+                rate = rate_override if rate_override is not None else self.assump.cost_of_debt
+                _add_loan(step, principal, rate, duration, pay_override)
+
+        # Loans commencing at the projection start -----------------------
+        _add_templates(0, self.start_age)
 
         # Backwards-compatible fallback (no templates) --------------------
-        if not active_loans and self.liabilities[0] > 0:
-            active_loans.append(_make_loan(self.liabilities[0], self.assump.cost_of_debt, None))
-
-        # ── 2. Projection loop ───────────────────────────────────────────
-        for t in range(years + 1):
-            age = self.start_age + t
-
-            # Inject loans that start this year (skip t=0 ones already added)
-            if age in self._loan_templates and (age != self.start_age or t != 0):
-                for spec in self._loan_templates[age]:
-                    if len(spec) == 4:
-                        principal, rate_override, duration, pay_override = spec
-                    else:
-                        principal, rate_override, duration = spec
-                        pay_override = None
-
-                    rate = rate_override if rate_override is not None else self.assump.cost_of_debt
-                    active_loans.append(_make_loan(principal, rate, duration, pay_override))
-
-            # Beginning of year balances ---------------------------------
-            a_begin_prev = self.assets[-1]
-            a_begin = a_begin_prev + self._asset_events.get(age, 0.0)
-            l_begin = sum(l.principal_remaining for l in active_loans)
-
-            # Regular income / expenses ----------------------------------
-            salary = sum(s.value_at(t) for s in self.income_streams)
-            expenses = sum(s.value_at(t) for s in self.expense_streams)
-            # Debt service ----------------------------------------------
-            liab_expense = 0.0
-            for loan in list(active_loans):  # copy -> safe removal
-                payment, _ = loan.make_payment()
-                liab_expense += payment
-                if loan.principal_remaining <= 1e-8:
-                    active_loans.remove(loan)
-
-            # Apply cash flows first? Excel assumes growth on beginning assets.
-            # 1) Interest on assets already invested at the **start** of the year
-            a_income = a_begin * self.assump.rate_of_return
-
-            # 2) Net cash flow during the year (salary – expenses – debt service)
-            net_saving = salary - expenses - liab_expense
-
-            # 3) End-of-year balance
-            a_next = a_begin + a_income + net_saving
-            l_next = sum(l.principal_remaining for l in active_loans)
-
-            if t < years:
-                self.assets.append(a_next)
-                self.liabilities.append(l_next)
-
-            rows.append({
-                "Age": age,
-                "Beginning Assets": round(a_begin, 10),
-                "Assets Income": round(a_income, 10),
-                "Beginning Liabilities": round(l_begin, 10),
-                "Liabilities Expense": round(liab_expense, 10),
-                "Salary": round(salary, 10),
-                "Expenses": round(expenses, 10),
-            })
-
-        self._table = pd.DataFrame(rows)
+        if not loans and self.liabilities[0] > 0:
+            _add_loan(0, self.liabilities[0], self.assump.cost_of_debt, None)
+
+        # Loans that start in later years ---------------------------------
+        for t in range(1, n):
+            _add_templates(t, self.start_age + t)
+
+        loan_step, loan_principal, loan_rate, loan_payment, loan_io = (
+            np.array(col, dtype=dtype)
+            for col, dtype in zip(
+                zip(*loans) if loans else ((),) * 5,
+                (np.int64, np.float64, np.float64, np.float64, np.bool_),
+            )
+        )
+
+        # ── 2. Regular income / expenses and one-off asset events ───────
+        ages = np.arange(self.start_age, self.start_age + n, dtype=np.int64)
+        salaries = project_series(self.income_streams, n)
+        expenses = project_series(self.expense_streams, n)
+        asset_events = np.array([self._asset_events.get(age, 0.0) for age in ages.tolist()], dtype=np.float64)
+
+        # ── 3. Yearly recurrence (compiled when numba is available) ─────
+        a_begin, a_income, l_begin, l_expense, a_end, l_end = _project_core(
+            float(self.assets[0]),
+            self.assump.rate_of_return,
+            asset_events,
+            salaries,
+            expenses,
+            loan_step,
+            loan_principal,
+            loan_rate,
+            loan_payment,
+            loan_io,
+        )
+
+        self.assets.extend(a_end[:-1].tolist())
+        self.liabilities.extend(l_end[:-1].tolist())
+
+        self._arrays = dict(
+            zip(
+                self.COLUMNS,
+                (ages, *(np.round(arr, 10) for arr in (a_begin, a_income, l_begin, l_expense, salaries, expenses))),
+            )
+        )
+        self._columns = None
+        self._table = None
         return self
 
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Projection as ``{column name → NumPy array}`` in :attr:`COLUMNS` order."""
+        if self._arrays is None:
+            raise RuntimeError("run() must be called before retrieving results.")
+        return self._arrays
+
+    @property
+    def final_ba(self) -> float:
+        """Beginning Assets of the last projected year, read off the array."""
+        return float(self.arrays()["Beginning Assets"][-1])
+
+    def columns(self) -> Dict[str, List]:
+        """Projection as ``{column name → list}`` of plain Python scalars.
+
+        Cheaper than :meth:`as_frame` for callers that only iterate the rows.
+        """
+        if self._columns is None:
+            self._columns = {name: arr.tolist() for name, arr in self.arrays().items()}
+        return self._columns
+
     def as_frame(self) -> pd.DataFrame:
         if self._table is None:
-            raise RuntimeError("run() must be called before retrieving results.")
+            # The arrays are already typed and in row order; wrap them as-is
+            # (no copy, no consolidation).  They are never written after run().
+            self._table = pd.DataFrame(self.arrays(), copy=False)
         return self._table
 
     def summary(self) -> Dict[str, float]:
-        if self._table is None:
+        if self._arrays is None:
             raise RuntimeError("run() must be called before retrieving results.")
         return {
             "Ending assets balance": float(self.assets[-1]),
@@ -303,6 +468,36 @@ class DCFModel:
     def add_expense_stream(self, stream: GrowingSeries) -> None:
         self.expense_streams.append(stream)
 
+    @classmethod
+    def make_specialized(
+        cls,
+        milestones: List[object],
+        index: int,
+        attr: str,
+        cache_size: int = 128,
+        **kwargs,
+    ) -> Callable[[object], "DCFModel"]:
+        """Return ``project(value)`` for sweeps over one milestone attribute.
+
+        The milestone records are snapshotted once; every call swaps *value*
+        into ``milestones[index].attr`` and runs the model.  The last
+        *cache_size* distinct values are memoised, so callers must treat the
+        returned models as read-only.  *kwargs* are passed on to
+        :meth:`from_milestones`.
+        """
+        base = [
+            dict(m) if isinstance(m, dict) else {f: getattr(m, f, None) for f in cls.MILESTONE_FIELDS}
+            for m in milestones
+        ]
+
+        @lru_cache(maxsize=cache_size)
+        def project(value) -> "DCFModel":
+            records = list(base)
+            records[index] = {**base[index], attr: value}
+            return cls.from_milestones(records, **kwargs).run()
+
+        return project
+
     # ------------------------------------------------------------------
     #  Convenience constructor – build a DCFModel directly from milestones
     # ------------------------------------------------------------------
@@ -350,15 +545,6 @@ class DCFModel:
             "current_liabilities": "liability",
         }
 
-        def _is_current(ms) -> bool:
-            """Return True when *ms* occurs at the projection start age.
-
-            We treat milestones whose *effective* start age equals *start_age*
-            (the earliest age across the scenario) as opening balances or
-            existing income/expense streams regardless of their name.
-            """
-            return _effective_age(ms) == start_age and (_get("milestone_type", ms) in ("Asset", "Liability", "Income", "Expense"))
-
         # ------------------------------------------------------------------
         #  Dynamic duration helper  (placed early so subsequent code can use it)
         # ------------------------------------------------------------------
@@ -450,20 +636,6 @@ class DCFModel:
 
             return _get("age_at_occurrence", ms)
 
-        # ------------------------------------------------------------------
-        #  Helper: convert PV amounts to nominal value at *start_age*
-        # ------------------------------------------------------------------
-        def _amount_at(ms):
-            """Return the milestone's *amount* expressed in nominal terms at its
-            effective age.  When the stored value is tagged as 'PV' we inflate
-            it by ``inflation_default`` for the years between *start_age* and
-            the milestone's effective age.  'FV' values are returned as-is."""
-            amt = _get("amount", ms) or 0.0
-            if (_get("amount_value_type", ms) or "FV") == "PV":
-                years = max(_effective_age(ms) - start_age, 0)
-                amt *= (1 + inflation_default) ** years
-            return amt
-
         # ------------------------------------------------------------------
         # 2. Derive projection horizon – stop at inheritance age when present
         # ------------------------------------------------------------------
@@ -478,10 +650,36 @@ class DCFModel:
         inh_ms_list = [m for m in milestones if _norm_name(_get("name", m)) == "inheritance"]
         inheritance_age = _get("age_at_occurrence", inh_ms_list[0]) if inh_ms_list else None
 
+        # ------------------------------------------------------------------
+        #  Resolve every milestone once into parallel columns (structure of
+        #  arrays).  The dynamic age/duration rules are recursive, so the
+        #  code below reads these columns instead of re-resolving per lookup.
+        # ------------------------------------------------------------------
+
+        eff_ages = [_effective_age(m) for m in milestones]
+        eff_durations = [_effective_duration(m) for m in milestones]
+        ms_types = [_get("milestone_type", m) for m in milestones]
+
+        # Amounts in nominal terms at their effective age: 'PV' values are
+        # inflated by ``inflation_default`` for the years between
+        # *start_age* and the milestone's effective age, 'FV' kept as-is.
+        amounts_at = []
+        for m, eff_age in zip(milestones, eff_ages):
+            amt = _get("amount", m) or 0.0
+            if (_get("amount_value_type", m) or "FV") == "PV":
+                amt *= (1 + inflation_default) ** max(eff_age - start_age, 0)
+            amounts_at.append(amt)
+
+        age_arr = np.array(eff_ages, dtype=float)
+        amount_arr = np.array(amounts_at, dtype=float)
+        type_arr = np.array([_TYPE_CODES.get(t, -1) for t in ms_types], dtype=np.int8)
+
+        # Opening balances / existing streams: anything of a known type that
+        # becomes active at *start_age*, regardless of its name.
+        is_current = (age_arr == start_age) & (type_arr >= 0)
+
         end_candidates = []
-        for m in milestones:
-            dur_val = _effective_duration(m)
-            eff_start = _effective_age(m)
+        for eff_start, dur_val in zip(eff_ages, eff_durations):
             if dur_val and dur_val > 0:
                 cand = eff_start + dur_val
             else:
@@ -517,8 +715,8 @@ class DCFModel:
         from collections import defaultdict
         liability_templates: Dict[int, List[tuple]] = defaultdict(list)
 
-        for ms in milestones:
-            if not _is_current(ms):
+        for i, ms in enumerate(milestones):
+            if not is_current[i]:
                 continue
 
             # ----------------------------------------------------------------
@@ -534,7 +732,7 @@ class DCFModel:
             # ----------------------------------------------------------------
             # Derive *annual* amount – convert monthly Income/Expense to yearly
             # ----------------------------------------------------------------
-            amt = _amount_at(ms)
+            amt = amounts_at[i]
             if (_get("occurrence", ms) or "Yearly") == "Monthly" and key in {"income", "expense"}:
                 amt *= 12  # monthly ⇒ yearly
 
@@ -553,13 +751,13 @@ class DCFModel:
 
             elif key == "income":
                 current_income_found = True
-                duration = _effective_duration(ms)
+                duration = eff_durations[i]
                 growth = _get("rate_of_return", ms) if _get("rate_of_return", ms) is not None else inflation_default
                 income_streams.append(GrowingSeries(amt, growth, start_step=0, duration=duration))
 
             elif key == "expense":
                 current_expense_found = True
-                duration = _effective_duration(ms)
+                duration = eff_durations[i]
                 growth = _get("rate_of_return", ms) if _get("rate_of_return", ms) is not None else inflation_default
                 expense_streams.append(GrowingSeries(amt, growth, start_step=0, duration=duration))
 
@@ -567,7 +765,7 @@ class DCFModel:
                 # Build amortising loan template for opening liabilities so that
                 # the defined *payment* and *duration* are honoured.
                 principal = amt
-                duration_ms = _effective_duration(ms)
+                duration_ms = eff_durations[i]
                 rate_override = _get("rate_of_return", ms)
 
                 payment_override = None
@@ -587,11 +785,7 @@ class DCFModel:
 
         # Fallback to legacy behaviour if explicit current_* milestones are absent
         def _sum_amount(m_type, age):
-            return sum(
-                _amount_at(x)
-                for x in milestones
-                if (_get("milestone_type", x) == m_type and _effective_age(x) == age)
-            )
+            return float(amount_arr[(type_arr == _TYPE_CODES[m_type]) & (age_arr == age)].sum())
 
         if current_vals.get("asset", 0.0) == 0.0:
             current_vals["asset"] = _sum_amount("Asset", start_age)
@@ -613,12 +807,13 @@ class DCFModel:
         legacy_assets_used = current_vals["asset"] == _sum_amount("Asset", start_age)
         legacy_liabs_used = current_vals["liability"] == _sum_amount("Liability", start_age)
 
-        for ms in milestones:
-            if _is_current(ms):
+        for i, ms in enumerate(milestones):
+            if is_current[i]:
                 continue  # already processed
 
-            mt = _get("milestone_type", ms)
-            amt = _amount_at(ms)
+            mt = ms_types[i]
+            eff_age = eff_ages[i]
+            amt = amounts_at[i]
 
             # Convert *monthly* figures to *yearly* equivalents **only** for
             # Income/Expense streams.  Asset or Liability amounts are one-off
@@ -626,8 +821,8 @@ class DCFModel:
             if (_get("occurrence", ms) or "Yearly") == "Monthly" and mt in ("Income", "Expense"):
                 amt *= 12
 
-            start_step = _effective_age(ms) - start_age
-            duration = _effective_duration(ms)
+            start_step = eff_age - start_age
+            duration = eff_durations[i]
             growth = _get("rate_of_return", ms) if _get("rate_of_return", ms) is not None else inflation_default
 
             if mt == "Income":
@@ -635,15 +830,15 @@ class DCFModel:
             elif mt == "Expense":
                 expense_streams.append(GrowingSeries(amt, growth, start_step=start_step, duration=duration))
             elif mt == "Asset":
-                if legacy_assets_used and _effective_age(ms) == start_age:
+                if legacy_assets_used and eff_age == start_age:
                     continue
-                asset_events.append((_effective_age(ms), amt))
+                asset_events.append((eff_age, amt))
             elif mt == "Liability":
                 # Build amortising loan template ---------------------------
-                age_at = _effective_age(ms)
+                age_at = eff_age
                 principal = amt  # principal balance stays exactly as entered
 
-                duration_ms = _effective_duration(ms)
+                duration_ms = eff_durations[i]
                 rate_override = _get("rate_of_return", ms)
 
                 # ------------------------------------------------------------------
@@ -690,10 +885,9 @@ class DCFModel:
         # ------------------------------------------------------------------
 
         liab_years: set[int] = set()
-        for ms in milestones:
-            if _get("milestone_type", ms) == "Liability" and _effective_duration(ms):
-                start = _effective_age(ms)
-                liab_years.update(range(start, start + _effective_duration(ms)))
+        for mt, start, dur in zip(ms_types, eff_ages, eff_durations):
+            if mt == "Liability" and dur:
+                liab_years.update(range(start, start + dur))
 
         model: "DCFModel" = cls(
             start_age=start_age,
@@ -27,8 +27,12 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
 import argparse
-import copy
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from dataclasses import fields
+from types import SimpleNamespace
 from typing import List, Tuple
 
 import numpy as np
@@ -36,36 +40,49 @@ import numpy as np
 from backend.app.database import db  # Flask-SQLAlchemy instance – needed for writes
 from backend.app.models.monte_carlo_dcf import MonteCarloDCF
 from backend.app.models.scenario_parameter_value import ScenarioParameterValue
-from backend.scripts.db_connector import DBConnector
+from backend.scripts.db_connector import DBConnector, MilestoneRow, UPSERT_INSERT
 from backend.scripts.dcf_calculator_manual import DCFModel
+from backend.scripts.scenario_dcf_iterator import FRAME_TO_DCF_COLUMNS
 from backend.app.models.milestone import Milestone
 
 # ---------------------------------------------------------------------------
 #  Helpers – apply scenario parameter value to a milestone list
 # ---------------------------------------------------------------------------
 
+def _cast_param(value):
+    """Best-effort numeric cast of a scenario parameter value."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
 def _apply_param(milestones: List[Milestone], spv: ScenarioParameterValue) -> None:
     """In-place update of *milestones* (deep-copy recommended by caller!)."""
     ms = next(m for m in milestones if m.id == spv.milestone_id)
 
     # ScenarioParameterValue.value is *always* stored as *str* in the DB so we
     # attempt a best-effort numeric cast first, falling back to string.
-    try:
-        val = float(spv.value)
-    except ValueError:
-        val = spv.value
-
-    setattr(ms, spv.parameter, val)
+    setattr(ms, spv.parameter, _cast_param(spv.value))
 
 # ---------------------------------------------------------------------------
 #  Core Monte Carlo routine – reusable, side-effect free
 # ---------------------------------------------------------------------------
 
 def _ending_ba(df) -> float:
-    """Return Beginning-Assets of the last row *or* age 100 when available."""
-    if (df.Age == 100).any():
-        return float(df.loc[df.Age == 100, "Beginning Assets"].iloc[0])
-    return float(df["Beginning Assets"].iloc[-1])
+    """Return Beginning-Assets of the last row *or* age 100 when available.
+
+    *df* may be a DataFrame or the ``{column → array}`` mapping returned by
+    :meth:`DCFModel.arrays` – only positional NumPy access is used.
+    """
+    ages = np.asarray(df["Age"])
+    ba = np.asarray(df["Beginning Assets"])
+    at_100 = np.flatnonzero(ages == 100)
+    return float(ba[at_100[0]] if at_100.size else ba[-1])
+
+
+# Columns copied from each ORM milestone into a picklable MilestoneRow
+_MILESTONE_FIELDS = tuple(f.name for f in fields(MilestoneRow))
 
 
 def simulate_milestones(
@@ -75,6 +92,7 @@ def simulate_milestones(
     iterations: int = 1000,
     sigma: float | None = None,
     debug: bool = False,
+    rng: np.random.Generator | None = None,
 ) -> Tuple[Tuple[int, object], Tuple[int, object]]:
     """Run Monte Carlo over *base_milestones* varying *spv*.
 
@@ -93,6 +111,9 @@ def simulate_milestones(
     debug: bool, default False
         Print every sampled value + resulting ending BA – useful to trace single
         simulations.
+    rng: numpy.random.Generator | None, default None
+        Source of the random draws; pass a seeded generator for reproducible
+        runs.  A fresh unseeded generator is used when omitted.
 
     Returns
     -------
@@ -101,9 +122,6 @@ def simulate_milestones(
         • *worst_df* produces the lowest ending BA.
     """
 
-    # Guard against accidental mutation of caller-provided milestone list
-    base_ms = copy.deepcopy(base_milestones)
-
     # Baseline value (mu) -------------------------------------------------
     try:
         mu = float(spv.value)
@@ -119,59 +137,82 @@ def simulate_milestones(
     if sigma is None:
         sigma = 0.1 * abs(mu) if mu != 0 else 0.01  # fallback for zero baseline
 
-    best_df = None
-    best_ba = -math.inf
-    best_iter = -1
-
-    worst_df = None
-    worst_ba = math.inf
-    worst_iter = -1
-
-    rng = np.random.default_rng()
+    # Draw every sample up-front ------------------------------------------
+    if rng is None:
+        rng = np.random.default_rng()
+    samples = rng.normal(loc=mu, scale=sigma, size=iterations).tolist()
 
-    for i in range(iterations):
-        candidate_ms = copy.deepcopy(base_ms)
+    # Clamp ages to human range when parameter is "age_at_occurrence" -----
+    if spv.parameter == "age_at_occurrence":
+        samples = [max(0, min(120, int(round(v)))) for v in samples]
 
-        # Random draw ----------------------------------------------------
-        sample_val = rng.normal(loc=mu, scale=sigma)
+    # The milestones are snapshotted once (never mutating the caller's list)
+    # and each draw only swaps the varied value in; recently seen draws
+    # (frequent for integer parameters) share one projection.  Only the
+    # best and worst models are held past their iteration.
+    target_idx = next(i for i, m in enumerate(base_milestones) if m.id == spv.milestone_id)
+    project = DCFModel.make_specialized(base_milestones, target_idx, spv.parameter)
 
-        # Clamp ages to human range when parameter is "age_at_occurrence" -----
-        if spv.parameter == "age_at_occurrence":
-            sample_val = max(0, min(120, int(round(sample_val))))
-
-        # Apply sampled parameter ----------------------------------------
-        spv_sample = copy.deepcopy(spv)
-        spv_sample.value = str(sample_val)
-        _apply_param(candidate_ms, spv_sample)
+    best_model = worst_model = None
+    best_ba = -math.inf
+    worst_ba = math.inf
+    best_iter = worst_iter = -1
 
-        # Run DCF ---------------------------------------------------------
-        df = DCFModel.from_milestones(candidate_ms).run().as_frame()
-        ending_ba = _ending_ba(df)
+    for i, sample_val in enumerate(samples):
+        model = project(_cast_param(str(sample_val)))
+        ending_ba = _ending_ba(model.arrays())
 
         if debug:
             print(f"iter {i:04d}: sample={sample_val}  ending_BA={ending_ba}")
 
         if ending_ba > best_ba:
-            best_ba, best_df, best_iter = ending_ba, df, i
+            best_ba, best_model, best_iter = ending_ba, model, i
         if ending_ba < worst_ba:
-            worst_ba, worst_df, worst_iter = ending_ba, df, i
+            worst_ba, worst_model, worst_iter = ending_ba, model, i
 
     # mypy appeasement – both must be set because at least 1 iteration
-    assert best_df is not None and worst_df is not None  # noqa
+    assert best_model is not None and worst_model is not None  # noqa
 
-    return (best_iter, best_df), (worst_iter, worst_df)
+    # Only the two selected paths are materialised as DataFrames
+    return (best_iter, best_model.as_frame()), (worst_iter, worst_model.as_frame())
 
 # ---------------------------------------------------------------------------
 #  Runner that persists results in the DB
 # ---------------------------------------------------------------------------
 
+def _simulate_job(job) -> tuple | None:
+    """Pool entry point: run :func:`simulate_milestones` for one parameter.
+
+    Returns ``None`` for non-numeric parameters so the caller can skip them.
+    """
+    base_ms, spv, iterations, sigma, debug = job
+    try:
+        return simulate_milestones(base_ms, spv, iterations=iterations, sigma=sigma, debug=debug)
+    except ValueError:
+        return None
+
+
 class MonteCarloSimulator:
-    """High-level orchestrator that works directly on the DB."""
+    """High-level orchestrator that works directly on the DB.
+
+    Every scenario parameter is simulated independently, so the simulations
+    are fanned out over a process pool; only the DB writes stay in this
+    process.  ``max_workers=1`` (or a single parameter) runs everything
+    in-process.
+    """
 
-    def __init__(self, *, iterations: int = 1000, sigma: float | None = None, debug: bool = False):
+    def __init__(
+        self,
+        *,
+        iterations: int = 1000,
+        sigma: float | None = None,
+        debug: bool = False,
+        max_workers: int | None = None,
+    ):
         self.iterations = iterations
         self.sigma = sigma
         self.debug = debug
+        self.max_workers = max_workers or os.cpu_count() or 1
 
         self.db_connector = DBConnector()
         self.read_session = self.db_connector.get_session()
@@ -190,91 +231,93 @@ class MonteCarloSimulator:
             ms_by_combo.setdefault((m.scenario_id, m.sub_scenario_id), []).append(m)
             ms_by_id[m.id] = m
 
+        jobs: list[tuple[tuple[int, int], ScenarioParameterValue]] = []
         for spv in spvs:
             ms = ms_by_id.get(spv.milestone_id)
             if ms is None:
                 # dangling reference – skip
                 continue
-            combo = (ms.scenario_id, ms.sub_scenario_id)
-            base_ms = ms_by_combo[combo]
-
-            try:
-                (best_iter, best_df), (worst_iter, worst_df) = simulate_milestones(
-                    base_ms,
-                    spv,
-                    iterations=self.iterations,
-                    sigma=self.sigma,
-                    debug=self.debug,
-                )
-            except ValueError:
+            jobs.append(((ms.scenario_id, ms.sub_scenario_id), spv))
+
+        for (combo, spv), result in zip(jobs, self._simulate(jobs, ms_by_combo)):
+            if result is None:
                 # Non-numeric parameter – log & skip without aborting the batch
                 if self.debug:
                     print(f"Skipping non-numeric parameter {spv.parameter}={spv.value}")
                 continue
+            (best_iter, best_df), (worst_iter, worst_df) = result
 
             # Persist the best & worst paths --------------------------------
-            self._upsert_df(best_df, spv, result_type="max", iteration=best_iter)
-            self._upsert_df(worst_df, spv, result_type="min", iteration=worst_iter)
+            self._upsert_df(best_df, spv, combo, result_type="max", iteration=best_iter)
+            self._upsert_df(worst_df, spv, combo, result_type="min", iteration=worst_iter)
+
+        self.write_session.commit()
+
+    def _simulate(self, jobs, ms_by_combo):
+        """Yield the :func:`_simulate_job` result for every ``(combo, spv)`` job."""
+        opts = (self.iterations, self.sigma, self.debug)
+        if self.max_workers == 1 or len(jobs) < 2:
+            for combo, spv in jobs:
+                yield _simulate_job((ms_by_combo[combo], spv, *opts))
+            return
+
+        # Workers get picklable snapshots instead of session-bound ORM objects
+        rows_by_combo = {
+            combo: [MilestoneRow(**{f: getattr(m, f, None) for f in _MILESTONE_FIELDS}) for m in ms_list]
+            for combo, ms_list in ms_by_combo.items()
+        }
+        payload = [
+            (
+                rows_by_combo[combo],
+                SimpleNamespace(milestone_id=spv.milestone_id, parameter=spv.parameter, value=spv.value),
+                *opts,
+            )
+            for combo, spv in jobs
+        ]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as ex:
+            yield from ex.map(_simulate_job, payload)
 
     # ------------------------------------------------------------------
     #  Internal helpers
     # ------------------------------------------------------------------
-    def _upsert_df(self, df, spv: ScenarioParameterValue, *, result_type: str, iteration: int):
+    def _upsert_df(self, df, spv: ScenarioParameterValue, combo: tuple[int, int], *, result_type: str, iteration: int):
+        """Insert or update the rows of *df* in one ``INSERT … ON CONFLICT``.
+
+        The statement runs on the write session's connection; the caller
+        commits once all combinations are written.
+        """
+        if df.empty:
+            return
+
+        head = {
+            "scenario_id": combo[0],
+            "sub_scenario_id": combo[1],
+            "scenario_parameter": spv.parameter,
+            "scenario_value": spv.value,
+            "result_type": result_type,
+            "iteration": iteration,
+        }
+        keys = tuple(FRAME_TO_DCF_COLUMNS.values())
         rows = [
-            MonteCarloDCF(
-                scenario_id=self._scenario_id_for_spv(spv),
-                sub_scenario_id=self._sub_scenario_id_for_spv(spv),
-                scenario_parameter=spv.parameter,
-                scenario_value=spv.value,
-                result_type=result_type,
-                iteration=iteration,
-                age=int(row.Age),
-                beginning_assets=row["Beginning Assets"],
-                assets_income=row["Assets Income"],
-                beginning_liabilities=row["Beginning Liabilities"],
-                liabilities_expense=row["Liabilities Expense"],
-                salary=row["Salary"],
-                expenses=row["Expenses"],
-            )
-            for _, row in df.iterrows()
+            {**head, **dict(zip(keys, row))}
+            for row in zip(*(df[name].tolist() for name in FRAME_TO_DCF_COLUMNS))
         ]
 
-        for r in rows:
-            obj = (
-                self.write_session.query(MonteCarloDCF)
-                .filter_by(
-                    scenario_id=r.scenario_id,
-                    sub_scenario_id=r.sub_scenario_id,
-                    scenario_parameter=r.scenario_parameter,
-                    scenario_value=r.scenario_value,
-                    result_type=r.result_type,
-                    age=r.age,
-                )
-                .one_or_none()
-            )
-            if obj is None:
-                obj = r
-            else:
-                obj.beginning_assets = r.beginning_assets
-                obj.assets_income = r.assets_income
-                obj.beginning_liabilities = r.beginning_liabilities
-                obj.liabilities_expense = r.liabilities_expense
-                obj.salary = r.salary
-                obj.expenses = r.expenses
-                obj.iteration = r.iteration
-            self.write_session.add(obj)
-
-        self.write_session.commit()
-
-    # ------------------------------------------------------------------
-    def _milestone_for_spv(self, spv: ScenarioParameterValue) -> Milestone:
-        return self.read_session.query(Milestone).filter_by(id=spv.milestone_id).one()
-
-    def _scenario_id_for_spv(self, spv: ScenarioParameterValue) -> int:
-        return self._milestone_for_spv(spv).scenario_id
-
-    def _sub_scenario_id_for_spv(self, spv: ScenarioParameterValue) -> int:
-        return self._milestone_for_spv(spv).sub_scenario_id
+        table = MonteCarloDCF.__table__
+        stmt = UPSERT_INSERT[self.write_session.get_bind().dialect.name](table)
+        updated = [c for c in keys if c != "age"] + ["iteration"]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                "scenario_id",
+                "sub_scenario_id",
+                "scenario_parameter",
+                "scenario_value",
+                "result_type",
+                "age",
+            ],
+            set_={**{c: stmt.excluded[c] for c in updated}, "updated_at": datetime.utcnow()},
+        )
+        self.write_session.execute(stmt, rows)
 
 # ---------------------------------------------------------------------------
 #  CLI entry-point
@@ -291,12 +334,15 @@ def _parse_args() -> argparse.Namespace:
              "When omitted, defaults to 10 % of the baseline value.",
     )
     p.add_argument("--debug", action="store_true", help="Print every iteration with sampled value + ending BA")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes for the simulations (default: CPU count)")
     return p.parse_args()
 
 
 def main():
     args = _parse_args()
-    sim = MonteCarloSimulator(iterations=args.iterations, sigma=args.sigma, debug=args.debug)
+    sim = MonteCarloSimulator(
+        iterations=args.iterations, sigma=args.sigma, debug=args.debug, max_workers=args.workers
+    )
     sim.run()
 
 
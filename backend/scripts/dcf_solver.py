@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import copy
+import math
 from typing import List, Dict, Tuple, Iterable, Any
 
+import numpy as np
+
 from .db_connector import DBConnector
 from .dcf_calculator_manual import DCFModel
-from .scenario_dcf_iterator import _norm_name  # reuse helper
+from .scenario_dcf_iterator import _norm_name, _fingerprint, _projected_model  # reuse helpers
 from backend.app.models.milestone import Milestone
 from backend.app.models.goal import Goal
 from backend.app.models.scenario_parameter_value import ScenarioParameterValue
@@ -20,8 +23,8 @@ class DCFGoalSolver:
     """Find a goal-parameter value so that the ending Beginning-Assets balance
     matches the *base* projection value.
 
-    The search uses a simple bisection algorithm and assumes the mapping
-    goal_parameter → Ending BA is monotonous (see note in README).
+    The search uses Illinois false position safeguarded by bisection and assumes
+    the mapping goal_parameter → Ending BA is monotonous (see note in README).
     """
 
     MAX_ITER = 40
@@ -103,28 +106,61 @@ class DCFGoalSolver:
             setattr(goal_ms, attr, solved_val)
             return solved_val, working_ms
 
-        # --- bisection -----------------------------------------------------
+        # --- bracketed refinement ----------------------------------------
+        # Illinois-style false position on r(x) = BA(x) - target: the
+        # interpolation step converges super-linearly, so a solve needs far
+        # fewer DCF runs than plain bisection.  Halving the residual of an
+        # end that is kept twice in a row stops it stalling, and if the
+        # bracket still fails to halve over two iterations the next probe is
+        # a bisection step.  Both ends are always the current bracket.
+        r_low, r_high = ba_low - self.target_ba, ba_high - self.target_ba
+        widths = [abs(high - low)]
+        side = 0  # -1: last probe replaced high, +1: it replaced low
         for _ in range(self.MAX_ITER):
-            mid = (low + high) / 2
-
-            ba_mid = self._ba_for_value(working_ms, goal_ms, attr, mid, is_age_attr)
-
-            # Log bisection probe -------------------------------------------------
-            self.progress.append((mid, ba_mid))
-
-            if abs(ba_mid - self.target_ba) <= self.TOL:
-                solved_val = int(round(mid)) if is_age_attr else mid
+            bisect = len(widths) > 2 and widths[-1] > widths[-3] / 2
+            denom = r_high - r_low
+            step = high - r_high * (high - low) / denom if denom and not bisect else None
+            if step is None or not math.isfinite(step) or not min(low, high) < step < max(low, high):
+                step = (low + high) / 2
+
+            if is_age_attr:
+                # Ages are evaluated yearly.  A step that rounds back onto a
+                # bracket end is replaced by the (integer) midpoint; once the
+                # ends are adjacent the bracket cannot shrink.
+                if abs(high - low) <= 1:
+                    nearer = low if abs(ba_low - self.target_ba) <= abs(ba_high - self.target_ba) else high
+                    solved_val = int(round(nearer))
+                    break
+                step = int(round(step))
+                if step in (low, high):
+                    step = int((low + high) // 2)
+
+            ba_mid = self._ba_for_value(working_ms, goal_ms, attr, step, is_age_attr)
+
+            # Log solver probe ---------------------------------------------------
+            self.progress.append((step, ba_mid))
+
+            solved_val = int(round(step)) if is_age_attr else step
+            r_mid = ba_mid - self.target_ba
+            if abs(r_mid) <= self.TOL:
                 break
 
             # Maintain the bracket
-            if (ba_low - self.target_ba) * (ba_mid - self.target_ba) < 0:
-                high = mid
-                ba_high = ba_mid
+            if r_low * r_mid < 0:
+                high, ba_high, r_high = step, ba_mid, r_mid
+                if side == -1:
+                    r_low /= 2
+                side = -1
             else:
-                low = mid
-                ba_low = ba_mid
-
-            solved_val = int(round(mid)) if is_age_attr else mid
+                low, ba_low, r_low = step, ba_mid, r_mid
+                if side == 1:
+                    r_high /= 2
+                side = 1
+            widths.append(abs(high - low))
+        else:
+            # Out of iterations: report the centre of the remaining bracket
+            if not is_age_attr:
+                solved_val = (low + high) / 2
 
         # Ensure final milestone list has the converged value
         setattr(goal_ms, attr, solved_val)
@@ -163,17 +199,17 @@ class DCFGoalSolver:
         return low, high
 
     def _ending_beginning_assets(self, milestones: List[Milestone]) -> float:
-        df = DCFModel.from_milestones(milestones).run().as_frame()
+        # Projections are memoised by milestone fingerprint, so probes that
+        # revisit a value (e.g. integer ages during the search) cost a lookup.
+        model = _projected_model(_fingerprint(milestones))
         if self.anchor_age is not None:
             # Prefer BA at the specified anchor age when available
-            try:
-                row = df.loc[df.Age == self.anchor_age]
-                if not row.empty:
-                    return float(row["Beginning Assets"].iloc[0])
-            except Exception:
-                # Fall back to last age below
-                pass
-        return float(df.loc[df.Age == df.Age.max(), "Beginning Assets"].iloc[0])
+            cols = model.arrays()
+            hits = np.flatnonzero(cols["Age"] == self.anchor_age)
+            if hits.size:
+                return float(cols["Beginning Assets"][hits[0]])
+        # Ages ascend, so the last row is the last age
+        return model.final_ba
 
     def _ba_for_value(self, milestones: List[Milestone], goal_ms: Milestone,
                       attr: str, val: float, is_age: bool) -> float:
@@ -385,23 +421,22 @@ class DCFSolverRunner:
                         tgt_inh_age = tgt_inh_ms.age_at_occurrence if tgt_inh_ms else combo_last_age.get(target_combo, None)
 
                         # Run DCF and pick BA at anchor age
-                        df_anchor = DCFModel.from_milestones(target_copy).run().as_frame()
+                        anchor_model = DCFModel.from_milestones(target_copy).run()
+                        anchor_ages = anchor_model.arrays()["Age"]
+                        hits = (
+                            np.flatnonzero(anchor_ages == tgt_inh_age)
+                            if tgt_inh_age is not None
+                            else anchor_ages[:0]
+                        )
                         anchor_ba_val: float
                         anchor_age_val: int
-                        if tgt_inh_age is not None:
-                            row = df_anchor.loc[df_anchor.Age == tgt_inh_age]
-                            if not row.empty:
-                                anchor_ba_val = float(row["Beginning Assets"].iloc[0])
-                                anchor_age_val = int(tgt_inh_age)
-                            else:
-                                # fallback to last row
-                                last_age_val = int(df_anchor.Age.max())
-                                anchor_ba_val = float(df_anchor.loc[df_anchor.Age == last_age_val, "Beginning Assets"].iloc[0])
-                                anchor_age_val = last_age_val
+                        if hits.size:
+                            anchor_ba_val = float(anchor_model.arrays()["Beginning Assets"][hits[0]])
+                            anchor_age_val = int(tgt_inh_age)
                         else:
-                            last_age_val = int(df_anchor.Age.max())
-                            anchor_ba_val = float(df_anchor.loc[df_anchor.Age == last_age_val, "Beginning Assets"].iloc[0])
-                            anchor_age_val = last_age_val
+                            # fallback to last row
+                            anchor_ba_val = anchor_model.final_ba
+                            anchor_age_val = int(anchor_ages[-1])
 
                         scenario_spv_anchor_cache[cache_key] = (anchor_ba_val, anchor_age_val)
 
@@ -428,8 +463,10 @@ class DCFSolverRunner:
                     })
 
                     # Build and store solved DCF rows -----------------
-                    df = DCFModel.from_milestones(solved_ms).run().as_frame()
-                    for _, row in df.iterrows():
+                    # Plain column lists – no DataFrame is built anywhere
+                    # on the solve path.
+                    cols = DCFModel.from_milestones(solved_ms).run().columns()
+                    for age, ba, ai, bl, le, sal, exp in zip(*(cols[name] for name in DCFModel.COLUMNS)):
                         solved_dcf_rows.append(
                             SolvedDCF(
                                 scenario_id=scenario_id,
@@ -437,13 +474,13 @@ class DCFSolverRunner:
                                 goal_parameter=goal.parameter,
                                 scenario_parameter=spv.parameter,
                                 scenario_value=spv.value,
-                                age=int(row.Age),
-                                beginning_assets=row["Beginning Assets"],
-                                assets_income=row["Assets Income"],
-                                beginning_liabilities=row["Beginning Liabilities"],
-                                liabilities_expense=row["Liabilities Expense"],
-                                salary=row["Salary"],
-                                expenses=row["Expenses"],
+                                age=age,
+                                beginning_assets=ba,
+                                assets_income=ai,
+                                beginning_liabilities=bl,
+                                liabilities_expense=le,
+                                salary=sal,
+                                expenses=exp,
                             )
                         )
 
@@ -453,31 +490,48 @@ class DCFSolverRunner:
 
     # ------------------------------------------------------------------
     def _upsert_solved_dcf(self, rows: Iterable[SolvedDCF]):
-        for r in rows:
-            obj = (
-                self.write_session.query(SolvedDCF)
-                .filter_by(
-                    scenario_id=r.scenario_id,
-                    sub_scenario_id=r.sub_scenario_id,
-                    goal_parameter=r.goal_parameter,
-                    scenario_parameter=r.scenario_parameter,
-                    scenario_value=r.scenario_value,
-                    age=r.age,
-                )
-                .one_or_none()
+        """Insert or update *rows* in ``solved_dcf`` with a single lookup query.
+
+        Existing rows for the affected scenarios are loaded once and matched in
+        memory on the unique key instead of issuing one SELECT (plus autoflush)
+        per row.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+
+        def _key(o) -> tuple:
+            return (
+                o.scenario_id,
+                o.sub_scenario_id,
+                o.goal_parameter,
+                o.scenario_parameter,
+                o.scenario_value,
+                o.age,
             )
-            if obj is None:
-                obj = r
-            else:
-                obj.beginning_assets = r.beginning_assets
-                obj.assets_income = r.assets_income
-                obj.beginning_liabilities = r.beginning_liabilities
-                obj.liabilities_expense = r.liabilities_expense
-                obj.salary = r.salary
-                obj.expenses = r.expenses
-            self.write_session.add(obj)
-        self.write_session.commit()
 
+        existing = {
+            _key(o): o
+            for o in self.write_session.query(SolvedDCF).filter(
+                SolvedDCF.scenario_id.in_({r.scenario_id for r in rows}),
+                SolvedDCF.sub_scenario_id.in_({r.sub_scenario_id for r in rows}),
+            )
+        }
+
+        with self.write_session.no_autoflush:
+            for r in rows:
+                obj = existing.get(_key(r))
+                if obj is None:
+                    existing[_key(r)] = r
+                    self.write_session.add(r)
+                else:
+                    obj.beginning_assets = r.beginning_assets
+                    obj.assets_income = r.assets_income
+                    obj.beginning_liabilities = r.beginning_liabilities
+                    obj.liabilities_expense = r.liabilities_expense
+                    obj.salary = r.salary
+                    obj.expenses = r.expenses
+        self.write_session.commit()
 
 if __name__ == "__main__":
     DCFSolverRunner().run()
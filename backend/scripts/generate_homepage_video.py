@@ -12,21 +12,24 @@ Run it from the project root:
 
 Dependencies:
     - pygame
-    - imageio[ffmpeg]
+    - imageio[ffmpeg]  (only used to locate the bundled ``ffmpeg`` binary)
     - numpy
 
 Add these to your environment (e.g. `pip install -r requirements.txt` after
 appending `pygame`, `imageio[ffmpeg]`).
+
+Frames are streamed to ``ffmpeg`` as raw RGB24 bytes over a pipe instead of
+going through ``imageio``'s writer, which re-validates every frame.
 """
 from __future__ import annotations
 
 import os
-import random
+import subprocess
 import sys
 from pathlib import Path
 
 import numpy as np
-import imageio.v2 as imageio  # v2 API kept for compatibility
+import imageio_ffmpeg  # ships an ffmpeg binary with imageio[ffmpeg]
 import pygame
 import pygame.gfxdraw  # noqa: F401 – required for anti-aliased circles
 
@@ -41,7 +44,6 @@ TOTAL_FRAMES = FPS * DURATION_SECONDS
 # Keep the rest of the constants in sync with landing_page_viz.py ------------
 GENERATION_LIMIT = 10
 SECTION_COUNT = 30
-DIRECTION = 1  # mutable in code – global for simplicity
 MIN_CHILDREN, MAX_CHILDREN = 1, 20
 JITTER_DISTANCE = 0
 SCREEN_MARGIN = 60
@@ -55,23 +57,45 @@ GROWTH_SPEED = 0.2
 FADE_SPEED = 0.02
 SPAWN_INTERVAL_FRAMES = 5
 MAX_POSITION_TRIES = 25
+RNG_SEED = 42                  # fixed seed → reproducible video
+
+_RNG = np.random.default_rng(RNG_SEED)
 
 # ---------------------------------------------------------------------------
 # Geometry helpers -----------------------------------------------------------
 
 
-def _ccw(A, B, C):
-    """Return True if A, B, C are counter-clockwise oriented."""
-    return (C[1] - A[1]) * (B[0] - A[0]) > (B[1] - A[1]) * (C[0] - A[0])
+def _ccw(ax, ay, bx, by, cx, cy):
+    """Element-wise: True where A, B, C are counter-clockwise oriented."""
+    return (cy - ay) * (bx - ax) > (by - ay) * (cx - ax)
+
+
+def first_clear_candidate(origin, candidates: np.ndarray, edges: np.ndarray) -> int:
+    """Return the index of the first candidate whose edge from *origin* does
+    not cross any of *edges* (shared endpoints don't count as crossings).
 
+    *candidates* is ``(T, 2)`` and *edges* is ``(E, 4)`` holding
+    ``x1, y1, x2, y2`` per row; all T×E tests run as one numpy expression.
+    Falls back to the last candidate when every one of them intersects.
+    """
+    if len(edges) == 0:
+        return 0
 
-def segments_intersect(p1, p2, p3, p4):
-    """Return True if segment p1-p2 intersects p3-p4 (excluding shared ends)."""
-    if p1 in (p3, p4) or p2 in (p3, p4):
-        return False
-    return _ccw(p1, p3, p4) != _ccw(p2, p3, p4) and _ccw(p1, p2, p3) != _ccw(
-        p1, p2, p4
+    px, py = origin
+    cx, cy = candidates[:, 0:1], candidates[:, 1:2]       # (T, 1)
+    x3, y3, x4, y4 = edges.T                              # (E,)
+
+    crosses = (
+        (_ccw(px, py, x3, y3, x4, y4) != _ccw(cx, cy, x3, y3, x4, y4))
+        & (_ccw(px, py, cx, cy, x3, y3) != _ccw(px, py, cx, cy, x4, y4))
     )
+    # Segments touching at an endpoint are not considered intersecting
+    shares_origin = ((x3 == px) & (y3 == py)) | ((x4 == px) & (y4 == py))
+    shares_cand = ((x3 == cx) & (y3 == cy)) | ((x4 == cx) & (y4 == cy))
+    crosses &= ~(shares_origin | shares_cand)
+
+    clear = ~crosses.any(axis=1)
+    return int(clear.argmax()) if clear.any() else len(candidates) - 1
 
 
 # ---------------------------------------------------------------------------
@@ -92,99 +116,116 @@ class Node:
 # Simulation core ------------------------------------------------------------
 
 
-def add_children(nodes: list[Node]):
-    """Spawn a new generation of children and prune old ones."""
-    global DIRECTION
-
-    parent = nodes[-1]
-    parent_section = parent.section
-    next_section = parent_section + DIRECTION
-    if next_section < 0 or next_section >= SECTION_COUNT:
-        DIRECTION *= -1
-        next_section = parent_section + DIRECTION
-
-    num_children = random.randint(MIN_CHILDREN, MAX_CHILDREN)
-    section_width = WIDTH / SECTION_COUNT
-    left_bound = next_section * section_width
-    right_bound = left_bound + section_width
-
-    for _ in range(num_children):
-        # find a valid position (avoid edge-edge intersection)
-        for _ in range(MAX_POSITION_TRIES):
-            new_x = random.uniform(max(left_bound + SCREEN_MARGIN, left_bound),
-                                   min(right_bound - SCREEN_MARGIN, right_bound))
-            new_y = random.uniform(SCREEN_MARGIN, HEIGHT - SCREEN_MARGIN)
-            candidate = (new_x, new_y)
-
-            intersects = False
-            for n in nodes:
-                for p in n.parents:
-                    if p not in nodes or p == parent:
-                        continue
-                    if segments_intersect(parent.position, candidate, p.position, n.position):
-                        intersects = True
-                        break
-                if intersects:
-                    break
-            if not intersects:
-                break
-
-        child = Node(position=candidate, section=next_section,
-                      generation=parent.generation + 1, parents=[parent])
-        nodes.append(child)
-
-    # prune by generation depth
-    max_gen = max(n.generation for n in nodes)
-    nodes[:] = [n for n in nodes if n.generation >= max_gen - (GENERATION_LIMIT - 1)]
-
-
-def draw(nodes: list[Node], surface: pygame.Surface):
-    """Advance animation state by one frame and render to *surface*."""
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-
-    # alive generations window
-    max_gen = max(n.generation for n in nodes)
-    min_alive_gen = max_gen - (GENERATION_LIMIT - 1)
-
-    # update growth / fade values
-    for node in nodes:
-        if node.growth < 1.0:
-            node.growth = min(1.0, node.growth + GROWTH_SPEED)
-        if node.generation < min_alive_gen:
-            node.fade = max(0.0, node.fade - FADE_SPEED)
-        else:
-            node.fade = 1.0
-
-    # purge fully faded
-    nodes[:] = [n for n in nodes if n.fade > 0.0]
-
-    # background fill
-    surface.fill(BG_COLOR)
-
-    # draw edges first
-    for node in nodes:
-        for parent in node.parents:
-            if parent in nodes:
-                end_x = parent.position[0] + (node.position[0] - parent.position[0]) * node.growth
-                end_y = parent.position[1] + (node.position[1] - parent.position[1]) * node.growth
-                alpha = int(255 * min(node.fade, parent.fade))
-                color = (*LINE_COLOR[:3], alpha)
-                pygame.draw.line(overlay, color, parent.position, (end_x, end_y), 1)
-
-    # draw nodes on top
-    for node in nodes:
-        if node.growth >= 1.0:
-            x, y = int(node.position[0]), int(node.position[1])
-            alpha = int(255 * node.fade)
-            outer_color = (*NODE_OUTER_COLOR[:3], alpha)
-            inner_color = (*NODE_INNER_COLOR[:3], alpha)
-            pygame.gfxdraw.aacircle(overlay, x, y, NODE_RADIUS, outer_color)
-            pygame.gfxdraw.filled_circle(overlay, x, y, NODE_RADIUS, outer_color)
-            inner_r = int(NODE_RADIUS * INNER_FILL_PERCENT)
-            if inner_r > 0:
-                pygame.gfxdraw.filled_circle(overlay, x, y, inner_r, inner_color)
-
-    surface.blit(overlay, (0, 0))
+class Simulation:
+    """Mutable animation state: live nodes, travel direction and the newest
+    generation spawned so far (tracked incrementally instead of re-scanning
+    every node twice per frame)."""
+
+    def __init__(self):
+        root = Node(position=(WIDTH // 2, HEIGHT // 2), section=0, generation=0)
+        root.growth = 1.0
+        self.nodes: list[Node] = [root]
+        self.direction = 1
+        self.max_generation = 0
+
+    def add_children(self):
+        """Spawn a new generation of children and prune old ones."""
+        nodes = self.nodes
+
+        parent = nodes[-1]
+        parent_section = parent.section
+        next_section = parent_section + self.direction
+        if next_section < 0 or next_section >= SECTION_COUNT:
+            self.direction *= -1
+            next_section = parent_section + self.direction
+
+        num_children = int(_RNG.integers(MIN_CHILDREN, MAX_CHILDREN, endpoint=True))
+        section_width = WIDTH / SECTION_COUNT
+        left_bound = next_section * section_width
+        right_bound = left_bound + section_width
+
+        # Existing edges the new ones must not cross.  Edges hanging off *parent*
+        # (including this spawn's children) share an endpoint, so the set is
+        # fixed for the whole call and is built once.
+        alive = {id(n) for n in nodes}
+        edges = np.array(
+            [(*p.position, *n.position)
+             for n in nodes for p in n.parents
+             if id(p) in alive and p is not parent],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+
+        # All placement attempts for all children drawn in one PRNG call
+        x_a = max(left_bound + SCREEN_MARGIN, left_bound)
+        x_b = min(right_bound - SCREEN_MARGIN, right_bound)
+        lo = np.array([min(x_a, x_b), SCREEN_MARGIN])
+        hi = np.array([max(x_a, x_b), HEIGHT - SCREEN_MARGIN])
+        cands = _RNG.uniform(lo, hi, size=(num_children, MAX_POSITION_TRIES, 2))
+
+        for tries in cands:
+            # find a valid position (avoid edge-edge intersection)
+            idx = first_clear_candidate(parent.position, tries, edges)
+            candidate = (float(tries[idx, 0]), float(tries[idx, 1]))
+
+            child = Node(position=candidate, section=next_section,
+                          generation=parent.generation + 1, parents=[parent])
+            nodes.append(child)
+
+        self.max_generation = max(self.max_generation, parent.generation + 1)
+
+        # prune by generation depth – only older generations are dropped, so
+        # max_generation is unaffected
+        min_gen = self.max_generation - (GENERATION_LIMIT - 1)
+        nodes[:] = [n for n in nodes if n.generation >= min_gen]
+
+    def draw(self, surface: pygame.Surface):
+        """Advance animation state by one frame and render to *surface*."""
+        nodes = self.nodes
+        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+
+        # alive generations window
+        min_alive_gen = self.max_generation - (GENERATION_LIMIT - 1)
+
+        # update growth / fade values
+        for node in nodes:
+            if node.growth < 1.0:
+                node.growth = min(1.0, node.growth + GROWTH_SPEED)
+            if node.generation < min_alive_gen:
+                node.fade = max(0.0, node.fade - FADE_SPEED)
+            else:
+                node.fade = 1.0
+
+        # purge fully faded
+        nodes[:] = [n for n in nodes if n.fade > 0.0]
+
+        # background fill
+        surface.fill(BG_COLOR)
+
+        # draw edges first (parent liveness via an id set, not a list scan)
+        alive = {id(n) for n in nodes}
+        for node in nodes:
+            for parent in node.parents:
+                if id(parent) in alive:
+                    end_x = parent.position[0] + (node.position[0] - parent.position[0]) * node.growth
+                    end_y = parent.position[1] + (node.position[1] - parent.position[1]) * node.growth
+                    alpha = int(255 * min(node.fade, parent.fade))
+                    color = (*LINE_COLOR[:3], alpha)
+                    pygame.draw.line(overlay, color, parent.position, (end_x, end_y), 1)
+
+        # draw nodes on top
+        for node in nodes:
+            if node.growth >= 1.0:
+                x, y = int(node.position[0]), int(node.position[1])
+                alpha = int(255 * node.fade)
+                outer_color = (*NODE_OUTER_COLOR[:3], alpha)
+                inner_color = (*NODE_INNER_COLOR[:3], alpha)
+                pygame.gfxdraw.aacircle(overlay, x, y, NODE_RADIUS, outer_color)
+                pygame.gfxdraw.filled_circle(overlay, x, y, NODE_RADIUS, outer_color)
+                inner_r = int(NODE_RADIUS * INNER_FILL_PERCENT)
+                if inner_r > 0:
+                    pygame.gfxdraw.filled_circle(overlay, x, y, inner_r, inner_color)
+
+        surface.blit(overlay, (0, 0))
 
 
 # ---------------------------------------------------------------------------
@@ -205,32 +246,38 @@ def main():
     video_dir.mkdir(parents=True, exist_ok=True)
     video_path = video_dir / "landing_visual.mp4"
 
-    writer = imageio.get_writer(
-        video_path,
-        fps=FPS,
-        codec="libx264",
-        quality=8,
-        macro_block_size=None,  # allow arbitrary resolution
+    # Raw RGB24 frames in on stdin, H.264 out – one write() per frame
+    proc = subprocess.Popen(
+        [
+            imageio_ffmpeg.get_ffmpeg_exe(), "-y",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "-s", f"{WIDTH}x{HEIGHT}", "-r", str(FPS),
+            "-i", "-",
+            "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+            str(video_path),
+        ],
+        stdin=subprocess.PIPE,
     )
 
     # initial state – root node
-    nodes: list[Node] = []
-    root = Node(position=(WIDTH // 2, HEIGHT // 2), section=0, generation=0)
-    root.growth = 1.0
-    nodes.append(root)
+    sim = Simulation()
 
     for frame_idx in range(TOTAL_FRAMES):
         if frame_idx % SPAWN_INTERVAL_FRAMES == 0:
-            add_children(nodes)
-        draw(nodes, screen)
+            sim.add_children()
+        sim.draw(screen)
 
-        # Convert the pygame Surface (W,H,RGB) to (H,W,RGB) for imageio
+        # Convert the pygame Surface (W,H,RGB) to row-major (H,W,RGB) bytes
         frame = np.transpose(pygame.surfarray.array3d(screen), (1, 0, 2))
-        writer.append_data(frame)
+        proc.stdin.write(frame.tobytes())
 
-    writer.close()
+    proc.stdin.close()
+    proc.wait()
     pygame.quit()
 
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
+
     print(f"✓ Generated video: {video_path}  ({DURATION_SECONDS}s @ {FPS} FPS)")
 
 
@@ -1,11 +1,17 @@
 from collections import defaultdict
-import math
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+import os
 
-from .db_connector import DBConnector
-from .dcf_calculator_manual import DCFModel, Assumptions, GrowingSeries
+from sqlalchemy import Engine, create_engine, delete, insert
+from sqlalchemy.orm import Session
 
-# Reuse the Flask-SQLAlchemy session for writes so that data is visible everywhere
-from backend.app.database import db  # type: ignore
+from .db_connector import DBConnector, MilestoneRow, UPSERT_INSERT
+from .dcf_calculator_manual import DCFModel, Assumptions
+
+# Reuse the Flask-SQLAlchemy engine for writes so that data is visible everywhere
+from backend.app.database import db, use_sqlite_pragmas  # type: ignore
 from backend.app.models.dcf import DCF  # type: ignore
 
 
@@ -14,12 +20,15 @@ from backend.app.models.dcf import DCF  # type: ignore
 # ---------------------------------------------------------------------------
 
 
+@lru_cache(maxsize=1024)
 def _norm_name(s: str | None) -> str:
     """Normalise milestone *name* for comparison.
 
     1. Convert to lower-case.
     2. Replace spaces and hyphens with an underscore so that
        "Current Salary" → "current_salary".
+
+    Milestone names repeat across scenarios, so results are memoised.
     """
     if s is None:
         return ""
@@ -34,25 +43,55 @@ _CURRENT_MAP = {
     "current_liabilities": "liability",
 }
 
+# Milestone types that can carry an opening balance/flow at start_age
+_CURRENT_MS_TYPES = frozenset({"Asset", "Liability", "Income", "Expense"})
+
+# Fallback milestone_type → DCF base input when the name is not in _CURRENT_MAP
+_TYPE_TO_GROUP = {
+    "Asset": "asset",
+    "Liability": "liability",
+    "Income": "income",
+    "Expense": "expense",
+}
 
-def _is_current_ms(ms, start_age: int) -> bool:
-    """Return ``True`` for milestones that happen **at the projection start**.
 
-    A milestone is considered *current* when its ``age_at_occurrence`` equals
-    the scenario's ``start_age``.  This captures opening balances and existing
-    salary/expense levels without relying on the milestone name."""
-    return ms.age_at_occurrence == start_age and ms.milestone_type in {"Asset", "Liability", "Income", "Expense"}
+# DataFrame column → dcf table column
+FRAME_TO_DCF_COLUMNS = {
+    "Age": "age",
+    "Beginning Assets": "beginning_assets",
+    "Assets Income": "assets_income",
+    "Beginning Liabilities": "beginning_liabilities",
+    "Liabilities Expense": "liabilities_expense",
+    "Salary": "salary",
+    "Expenses": "expenses",
+}
 
+def _fingerprint(milestones) -> tuple:
+    """Hashable signature of everything the DCF model depends on.
 
-def _sum_amount(milestones, m_type, age):
-    """Sum *amount* for milestones of *m_type* that occur at *age*."""
-    return sum(
-        m.amount or 0
+    One row per milestone over :attr:`DCFModel.MILESTONE_FIELDS`, with the
+    name normalised.  Order is preserved on purpose: it decides float
+    summation order and which milestone wins a duplicated name in
+    ``from_milestones``.
+    """
+    return tuple(
+        tuple(_norm_name(m.name) if f == "name" else getattr(m, f, None) for f in DCFModel.MILESTONE_FIELDS)
         for m in milestones
-        if (m.milestone_type == m_type and m.age_at_occurrence == age)
     )
 
 
+@lru_cache(maxsize=256)
+def _projected_model(fingerprint: tuple) -> DCFModel:
+    """Build and run the DCF model for a milestone *fingerprint* (memoised).
+
+    Sub-scenarios frequently share an identical milestone set, in which case
+    the projection is computed once and reused.  Callers must treat the
+    returned model as read-only.
+    """
+    milestones = [dict(zip(DCFModel.MILESTONE_FIELDS, row)) for row in fingerprint]
+    return DCFModel.from_milestones(milestones).run()
+
+
 # ---------------------------------------------------------------------------
 #  ScenarioDCF – projection & persistence for a single scenario/sub-scenario
 # ---------------------------------------------------------------------------
@@ -61,20 +100,30 @@ def _sum_amount(milestones, m_type, age):
 class ScenarioDCF:
     """Handle the end-to-end DCF projection for one Scenario → Sub-scenario pair."""
 
-    def __init__(self, db_connector: DBConnector, scenario_id: int, sub_scenario_id: int):
-        """Prepare a run for one (scenario_id, sub_scenario_id) pair."""
+    def __init__(self, db_connector: DBConnector | None, scenario_id: int, sub_scenario_id: int,
+                 *, milestones: list[MilestoneRow] | None = None,
+                 engine: Engine | None = None, exclusive: bool = False):
+        """Prepare a run for one (scenario_id, sub_scenario_id) pair.
 
-        # shared write-session
-        self.session = db.session  # type: ignore
+        Pass ``exclusive=True`` when nothing else writes this pair's rows
+        concurrently (e.g. from :class:`ScenarioDCFIterator`); ``run()`` then
+        replaces the projection wholesale instead of upserting row by row.
 
-        # independent read-only session (avoids locking long transactions)
-        self.read_session = db_connector.get_session()
+        Callers that already hold this pair's *milestones* (and, in a worker
+        process, their own write *engine*) can pass them in – *db_connector*
+        is then not touched at all.
+        """
 
-        data = db_connector.fetch_all_data(self.read_session)
-        self.milestones = [
-            m for m in data["milestones"]
-            if m.scenario_id == scenario_id and m.sub_scenario_id == sub_scenario_id
-        ]
+        # shared app engine for writes unless the caller brings its own;
+        # resolved lazily (see ``engine``) so no app context is needed here
+        self._engine = engine
+        self.exclusive = exclusive
+
+        if milestones is None:
+            # short-lived read-only session (avoids locking long transactions)
+            with db_connector.get_session() as read_session:
+                milestones = db_connector.fetch_milestones(read_session, scenario_id, sub_scenario_id)
+        self.milestones = list(milestones)
 
         self.scenario_id = scenario_id
         self.sub_scenario_id = sub_scenario_id
@@ -82,119 +131,84 @@ class ScenarioDCF:
         if not self.milestones:
             raise ValueError(f"No milestones found for scenario {scenario_id}/{sub_scenario_id}")
 
-        # — derive timeline bounds ------------------------------------------------
-        self.start_age = min(m.age_at_occurrence for m in self.milestones)
-
-        # When a milestone has a finite duration we need to project until the very
-        # last year of that stream.  Otherwise we could truncate a salary that
-        # ends at retirement, for example.
-        end_candidates = [
-            (m.age_at_occurrence + (m.duration or 0)) if (m.duration and m.duration > 0) else m.age_at_occurrence
-            for m in self.milestones
-        ]
-        self.end_age = max(end_candidates)
-
         # ------------------------------------------------------------------
-        # 1. Identify "current_*" milestones (single row each, occurring at
-        #    start_age) that define the opening balances/flows.
+        # 1. Single pass over the milestones: timeline bounds and the opening
+        #    balances/flows of the "current" milestones (those occurring at
+        #    start_age).
+        #
+        #    start_age is only known at the end, so the opening accumulators
+        #    are reset whenever an earlier age turns up.
         # ------------------------------------------------------------------
-        current_vals = defaultdict(float)  # groups: asset/liability/income/expense
+        start_age: int | None = None
+        end_age: int | None = None
+        # Opening values per group (asset/liability/income/expense) – four plain
+        # accumulators plus "seen" flags instead of a dict.
+        asset_v = liab_v = inc_v = exp_v = 0.0
+        seen_asset = seen_liab = seen_inc = seen_exp = False
+        start_type_sums = defaultdict(float)  # milestone_type → amount at start_age
 
         for ms in self.milestones:
-            if not _is_current_ms(ms, self.start_age):
-                continue
-
-            norm = _norm_name(ms.name)
-            group_key = _CURRENT_MAP.get(norm)
-            if group_key is None:
-                # Fallback to milestone_type which maps 1:1 to the desired key
-                group_key = ms.milestone_type.lower()
-            current_vals[group_key] += ms.amount or 0.0
+            age = ms.age_at_occurrence
+            mt = ms.milestone_type
 
-        self.initial_assets = current_vals.get("asset", None)
-        self.initial_liabilities = current_vals.get("liability", None)
-        self.base_salary = current_vals.get("income", None)
-        self.base_expenses = current_vals.get("expense", None)
+            # When a milestone has a finite duration we need to project until the
+            # very last year of that stream.  Otherwise we could truncate a salary
+            # that ends at retirement, for example.
+            end = (age + ms.duration) if (ms.duration and ms.duration > 0) else age
+            if end_age is None or end > end_age:
+                end_age = end
+
+            if start_age is None or age < start_age:
+                start_age = age
+                asset_v = liab_v = inc_v = exp_v = 0.0
+                seen_asset = seen_liab = seen_inc = seen_exp = False
+                start_type_sums.clear()
+
+            if age == start_age:
+                amt = ms.amount or 0.0
+                start_type_sums[mt] += amt
+                if mt in _CURRENT_MS_TYPES:
+                    # Fallback to milestone_type which maps 1:1 to the desired key
+                    group_key = _CURRENT_MAP.get(_norm_name(ms.name)) or _TYPE_TO_GROUP[mt]
+                    if group_key == "asset":
+                        asset_v += amt
+                        seen_asset = True
+                    elif group_key == "liability":
+                        liab_v += amt
+                        seen_liab = True
+                    elif group_key == "income":
+                        inc_v += amt
+                        seen_inc = True
+                    else:
+                        exp_v += amt
+                        seen_exp = True
+
+        self.start_age = start_age
+        self.end_age = end_age
 
         # Legacy fallback – when the database does *not* yet store dedicated
         # current_* milestones we revert to the previous behaviour that summed
         # everything at *start_age*.
-        if self.initial_assets is None:
-            self.initial_assets = _sum_amount(self.milestones, "Asset", self.start_age)
-        if self.initial_liabilities is None:
-            self.initial_liabilities = _sum_amount(self.milestones, "Liability", self.start_age)
-        if self.base_salary is None:
-            self.base_salary = _sum_amount(self.milestones, "Income", self.start_age)
-        if self.base_expenses is None:
-            self.base_expenses = _sum_amount(self.milestones, "Expense", self.start_age)
+        self.initial_assets = asset_v if seen_asset else start_type_sums.get("Asset")
+        self.initial_liabilities = liab_v if seen_liab else start_type_sums.get("Liability")
+        self.base_salary = inc_v if seen_inc else start_type_sums.get("Income")
+        self.base_expenses = exp_v if seen_exp else start_type_sums.get("Expense")
 
         # ------------------------------------------------------------------
-        # 2. Build cash-flow streams & one-off events from the remaining
-        #    milestones.
-        # ------------------------------------------------------------------
-        self.income_streams: list[GrowingSeries] = []
-        self.expense_streams: list[GrowingSeries] = []
-        self.asset_events: list[tuple[int, float]] = []
-        self.liability_events: list[tuple[int, float]] = []
-
-        inflation_default = 0.02  # Keep in sync with INFLATION_RATE in API/front-end
-
-        legacy_assets_used = "asset" not in current_vals
-        legacy_liabilities_used = "liability" not in current_vals
-
-        for ms in self.milestones:
-            # Skip the current_* milestones – already processed above
-            if _is_current_ms(ms, self.start_age):
-                continue
-
-            mt = ms.milestone_type
-            amt = ms.amount or 0.0
-
-            # Convert monthly amounts to yearly so that the DCF (which works on
-            # yearly periods) sees a like-for-like value.
-            if (ms.occurrence or "Yearly") == "Monthly" and mt in ("Income", "Expense"):
-                amt *= 12
-
-            start_step = ms.age_at_occurrence - self.start_age
-            duration = ms.duration if (ms.disbursement_type == "Fixed Duration") else None
-            growth = ms.rate_of_return if ms.rate_of_return is not None else inflation_default
-
-            if mt == "Income":
-                self.income_streams.append(GrowingSeries(amt, growth, start_step=start_step, duration=duration))
-            elif mt == "Expense":
-                self.expense_streams.append(GrowingSeries(amt, growth, start_step=start_step, duration=duration))
-            elif mt == "Asset":
-                # Avoid double-counting: when we *did not* use current_liquid_assets
-                # we already summed all assets at start_age into the opening balance.
-                if legacy_assets_used and ms.age_at_occurrence == self.start_age:
-                    # Already reflected in initial_assets
-                    continue
-                self.asset_events.append((ms.age_at_occurrence, amt))
-            elif mt == "Liability":
-                if legacy_liabilities_used and ms.age_at_occurrence == self.start_age:
-                    continue
-
-                # Keep principal as-is – do NOT multiply by 12
-                liability_amt = amt
-
-                # Convert duration & payment when the entry is specified monthly
-                if (ms.occurrence or "Yearly") == "Monthly":
-                    if ms.duration is not None:
-                        ms.duration = max(int(math.ceil(ms.duration / 12)), 1)
-
-                    if ms.payment is not None:
-                        ms.payment = ms.payment * 12  # store annual figure so that downstream code can honour it
-
-                self.liability_events.append((ms.age_at_occurrence, liability_amt))
-
-        # ------------------------------------------------------------------
-        # 3. Guarantee non-zero defaults so the DCF always runs.
+        # 2. Guarantee non-zero defaults so the DCF always runs.
         # ------------------------------------------------------------------
         self.initial_assets = self.initial_assets or 0.0
         self.initial_liabilities = self.initial_liabilities or 0.0
         self.base_salary = self.base_salary or 0.0
         self.base_expenses = self.base_expenses or 0.0
 
+    @property
+    def engine(self) -> Engine:
+        """Write engine – the caller's, else the shared app engine on first use."""
+        if self._engine is None:
+            self._engine = db.engine  # type: ignore
+        return self._engine
+
     # ---------------------------------------------------------------------
     #  DCF calculation & persistence
     # ---------------------------------------------------------------------
@@ -202,53 +216,64 @@ class ScenarioDCF:
     def run(self):
         # Let DCFModel derive macro assumptions (inflation, ROI, cost_of_debt)
         # directly from milestones so that scenario-specific parameters are honoured.
-        model = DCFModel.from_milestones(self.milestones).run()
-        df = model.as_frame()
+        model = _projected_model(_fingerprint(self.milestones))
+        cols = model.columns()
 
-        # Map DataFrame → ORM rows (snake_case col names match DCF table)
+        # Map the model's column lists → plain dicts (snake_case col names match
+        # the DCF table) without materialising a DataFrame.
+        keys = ("scenario_id", "sub_scenario_id", *FRAME_TO_DCF_COLUMNS.values())
+        pair = (self.scenario_id, self.sub_scenario_id)
         records = [
-            DCF(
-                scenario_id=self.scenario_id,
-                sub_scenario_id=self.sub_scenario_id,
-                age=int(row.Age),
-                beginning_assets=row["Beginning Assets"],
-                assets_income=row["Assets Income"],
-                beginning_liabilities=row["Beginning Liabilities"],
-                liabilities_expense=row["Liabilities Expense"],
-                salary=row["Salary"],
-                expenses=row["Expenses"],
-            )
-            for _, row in df.iterrows()
+            dict(zip(keys, pair + row))
+            for row in zip(*(cols[name] for name in FRAME_TO_DCF_COLUMNS))
         ]
 
-        self._upsert_rows(records)
+        if self.exclusive:
+            self._replace_rows(records)
+        else:
+            self._upsert_rows(records)
 
     # ------------------------------------------------------------------
     #  Private helpers
     # ------------------------------------------------------------------
 
-    def _upsert_rows(self, rows):
-        """Insert or update the *rows* in the dcf table (idempotent)."""
-        for r in rows:
-            obj = (
-                self.session.query(DCF)
-                .filter_by(scenario_id=r.scenario_id, sub_scenario_id=r.sub_scenario_id, age=r.age)
-                .one_or_none()
+    def _replace_rows(self, rows: list[dict]):
+        """Delete this pair's projection and bulk-insert *rows* in its place.
+
+        Only safe when the caller owns the pair exclusively – there is no
+        conflict handling, but also no ORM unit-of-work overhead: both
+        statements run on a Core connection inside one transaction.
+        """
+        with self.engine.begin() as conn:
+            conn.execute(
+                delete(DCF.__table__).where(
+                    DCF.scenario_id == self.scenario_id,
+                    DCF.sub_scenario_id == self.sub_scenario_id,
+                )
             )
-            if obj is None:
-                obj = r
-            else:
-                # Update all flow columns
-                obj.beginning_assets = r.beginning_assets
-                obj.assets_income = r.assets_income
-                obj.beginning_liabilities = r.beginning_liabilities
-                obj.liabilities_expense = r.liabilities_expense
-                obj.salary = r.salary
-                obj.expenses = r.expenses
+            if rows:
+                conn.execute(insert(DCF.__table__), rows)
+
+    def _upsert_rows(self, rows: list[dict]):
+        """Insert or update the *rows* in the dcf table (idempotent).
 
-            self.session.add(obj)
+        Issues a single ``INSERT … ON CONFLICT (scenario_id, sub_scenario_id,
+        age) DO UPDATE`` for the whole batch instead of one lookup per row, on
+        a Core connection in its own transaction.
+        """
+        if not rows:
+            return
 
-        self.session.commit()
+        dialect = self.engine.dialect.name
+        stmt = UPSERT_INSERT[dialect](DCF.__table__)
+        flow_cols = [c for c in FRAME_TO_DCF_COLUMNS.values() if c != "age"]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["scenario_id", "sub_scenario_id", "age"],
+            set_={**{c: stmt.excluded[c] for c in flow_cols}, "updated_at": datetime.utcnow()},
+        )
+
+        with self.engine.begin() as conn:
+            conn.execute(stmt, rows)
 
 
 # ---------------------------------------------------------------------------
@@ -256,28 +281,65 @@ class ScenarioDCF:
 # ---------------------------------------------------------------------------
 
 
+# Per-process engine, set up by ``_init_worker`` in pool workers
+_WORKER_ENGINE: Engine | None = None
+
+
+def _init_worker(database_uri: str):
+    """Give each pool worker its own engine (engines are not fork-safe)."""
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = create_engine(database_uri)
+    use_sqlite_pragmas(_WORKER_ENGINE)
+
+
+def _project_pair(pair: tuple[int, int], milestones, engine: Engine | None = None):
+    """Project one ``(scenario_id, sub_scenario_id)`` pair from its *milestones*."""
+    try:
+        ScenarioDCF(
+            None, *pair, milestones=milestones, engine=engine, exclusive=True,
+        ).run()
+    except ValueError:
+        # Skip combinations without milestones – keeps behaviour identical
+        pass
+
+
+def _run_one(pair: tuple[int, int]):
+    """Pool entry point: fetch and project one pair with this worker's own engine."""
+    with Session(_WORKER_ENGINE) as session:
+        milestones = DBConnector().fetch_milestones(session, *pair)
+    _project_pair(pair, milestones, _WORKER_ENGINE)
+
+
 class ScenarioDCFIterator:
-    """Iterates over all Scenario → Sub-scenario combinations and calculates DCFs."""
+    """Iterates over all Scenario → Sub-scenario combinations and calculates DCFs.
 
-    def __init__(self):
+    Combinations are independent, so they are fanned out over a process pool
+    where each worker loads only its own pair's milestones.  ``max_workers=1``
+    (or a single combination, or an in-memory SQLite DB that other processes
+    cannot see) keeps everything in the current process.
+    """
+
+    def __init__(self, max_workers: int | None = None):
         self.db_connector = DBConnector()
-        self.read_session = self.db_connector.get_session()
+        self.max_workers = max_workers or os.cpu_count() or 1
 
     def run(self):
-        data = self.db_connector.fetch_all_data(self.read_session)
-        combos = {
-            (m.scenario_id, m.sub_scenario_id)
-            for m in data["milestones"]
-        }
-
-        for scenario_id, sub_scenario_id in combos:
-            try:
-                sc_dcf = ScenarioDCF(self.db_connector, scenario_id, sub_scenario_id)
-                sc_dcf.run()
-            except ValueError:
-                # Skip combinations without milestones – keeps behaviour identical
-                continue
-
+        with self.db_connector.get_session() as read_session:
+            pairs = self.db_connector.scenario_sub_pairs(read_session)
+            url = read_session.get_bind().url
+
+            in_memory = url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+            if self.max_workers == 1 or len(pairs) < 2 or in_memory:
+                for pair in pairs:
+                    _project_pair(pair, self.db_connector.fetch_milestones(read_session, *pair))
+                return
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(url.render_as_string(hide_password=False),),
+        ) as ex:
+            list(ex.map(_run_one, pairs))
 
 if __name__ == "__main__":
     ScenarioDCFIterator().run()
@@ -38,3 +38,20 @@ def test_milestone_values_by_age_data(db_connector):
     data = get_data(db_connector)
     assert data["milestone_values_by_age"] is not None
     # assert len(data["milestone_values_by_age"][0].to_dict()) > 0
+
+def test_fetch_milestones(db_connector):
+    sess = db_connector.get_session()
+    first = db_connector.fetch_all_data(sess)["milestones"][0]
+    milestones = db_connector.fetch_milestones(sess, first.scenario_id, first.sub_scenario_id)
+    assert first.id in {m.id for m in milestones}
+    assert all(
+        m.scenario_id == first.scenario_id and m.sub_scenario_id == first.sub_scenario_id
+        for m in milestones
+    )
+
+def test_scenario_sub_pairs(db_connector):
+    sess = db_connector.get_session()
+    milestones = db_connector.fetch_all_data(sess)["milestones"]
+    pairs = db_connector.scenario_sub_pairs(sess)
+    assert len(pairs) == len(set(pairs))
+    assert set(pairs) == {(m.scenario_id, m.sub_scenario_id) for m in milestones}
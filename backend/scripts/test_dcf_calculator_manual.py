@@ -12,9 +12,10 @@ from __future__ import annotations
 
 import math
 
+import numpy as np
 import pytest
 
-from .dcf_calculator_manual import DCFModel, Assumptions
+from .dcf_calculator_manual import DCFModel, Assumptions, GrowingSeries
 
 
 # --------------------------------------------------------------------
@@ -188,6 +189,23 @@ def test_as_frame_row_count(simple_dcf_model: DCFModel):
     assert len(df) == expected_rows
 
 
+def test_columns_match_frame(simple_dcf_model: DCFModel):
+    """``columns()`` must expose exactly the data behind ``as_frame()``."""
+
+    cols = simple_dcf_model.columns()
+    df = simple_dcf_model.as_frame()
+    assert tuple(cols) == DCFModel.COLUMNS == tuple(df.columns)
+    for name, values in cols.items():
+        assert values == df[name].tolist()
+
+
+def test_final_ba_is_last_row(simple_dcf_model: DCFModel):
+    """``final_ba`` must equal the last Beginning Assets value of the frame."""
+
+    df = simple_dcf_model.as_frame()
+    assert simple_dcf_model.final_ba == df["Beginning Assets"].iat[-1]
+
+
 def test_salary_and_expense_growth(simple_dcf_model: DCFModel):
     """Verify that salary & expenses grow with inflation each year."""
 
@@ -207,6 +225,22 @@ def test_salary_and_expense_growth(simple_dcf_model: DCFModel):
         assert math.isclose(row.Expenses, expected_expense, rel_tol=1e-6)
 
 
+@pytest.mark.parametrize(
+    "series",
+    [
+        GrowingSeries(1_000, 0.03),
+        GrowingSeries(1_000, 0.05, start_step=2, duration=3),
+        GrowingSeries(500, -1.0, start_step=1),
+    ],
+)
+def test_series_values_match_value_at(series: GrowingSeries):
+    """The vectorised series must agree with the scalar definition."""
+
+    steps = np.arange(8)
+    expected = [series.value_at(int(t)) for t in steps]
+    assert series.values(steps).tolist() == pytest.approx(expected, rel=1e-12)
+
+
 def test_summary_matches_internal_state(simple_dcf_model: DCFModel):
     """Ensure that summary() returns the same numbers kept in the instance."""
 
@@ -386,4 +420,15 @@ def test_dynamic_duration_current_flows(ret_age, expected_duration):
     print(f"Dynamic df at age {ret_age}: \n{df}")
 
     # Quick sanity: the projection should include all ages up to retirement
-    assert (df.Age.max() >= ret_age), "Projection truncated before retirement milestone."
\ No newline at end of file
+    assert (df.Age.max() >= ret_age), "Projection truncated before retirement milestone."
+
+def test_make_specialized_matches_from_milestones():
+    """A specialised sweep must reproduce a full rebuild for every value."""
+
+    project = DCFModel.make_specialized(_build_dynamic_milestones(36), 4, "age_at_occurrence")
+    for ret_age in (35, 36, 38):
+        expected = DCFModel.from_milestones(_build_dynamic_milestones(ret_age)).run()
+        assert project(ret_age).columns() == expected.columns()
+
+    # Repeated values reuse the earlier projection
+    assert project(35) is project(35)
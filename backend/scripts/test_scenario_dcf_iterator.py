@@ -1,5 +1,7 @@
 import pytest
+from sqlalchemy import func
 
+from backend.app.models.milestone import Milestone
 from .scenario_dcf_iterator import ScenarioDCFIterator
 from .db_connector import DBConnector
 from backend.app.models.dcf import DCF
@@ -27,7 +29,7 @@ def test_unique_projection_constraint(seeded_session):
     duplicates = (
         seeded_session.query(DCF.scenario_id, DCF.sub_scenario_id, DCF.age)
         .group_by(DCF.scenario_id, DCF.sub_scenario_id, DCF.age)
-        .having(pytest.importorskip("sqlalchemy").func.count() > 1)
+        .having(func.count() > 1)
         .all()
     )
     assert not duplicates, "Duplicate projection rows were found in the DCF table."
@@ -35,27 +37,26 @@ def test_unique_projection_constraint(seeded_session):
 
 def test_projection_covers_age_range(seeded_session):
     """For every scenario/sub-scenario all ages from min→max milestone age must be present."""
-    # Pull min/max ages from milestones for each combo
-    db = DBConnector()
-    session = db.get_session()
-    milestones = session.query(pytest.importorskip("backend.app.models.milestone").Milestone).all()
-
-    combo_to_age_range = {}
-    for m in milestones:
-        key = (m.scenario_id, m.sub_scenario_id)
-        combo_to_age_range.setdefault(key, [m.age_at_occurrence, m.age_at_occurrence])
-        combo_to_age_range[key][0] = min(combo_to_age_range[key][0], m.age_at_occurrence)
-        combo_to_age_range[key][1] = max(combo_to_age_range[key][1], m.age_at_occurrence)
+    # Pull min/max ages from milestones for each combo in one aggregate query
+    combo_to_age_range = {
+        (scenario_id, sub_scenario_id): (min_age, max_age)
+        for scenario_id, sub_scenario_id, min_age, max_age in seeded_session.query(
+            Milestone.scenario_id,
+            Milestone.sub_scenario_id,
+            func.min(Milestone.age_at_occurrence),
+            func.max(Milestone.age_at_occurrence),
+        ).group_by(Milestone.scenario_id, Milestone.sub_scenario_id)
+    }
+
+    # One query for every projected age, grouped per combo in Python
+    ages_by_combo = {}
+    for scenario_id, sub_scenario_id, age in seeded_session.query(DCF.scenario_id, DCF.sub_scenario_id, DCF.age):
+        ages_by_combo.setdefault((scenario_id, sub_scenario_id), set()).add(age)
 
     for (scenario_id, sub_scenario_id), (min_age, max_age) in combo_to_age_range.items():
-        ages_in_dcf = {
-            age for (age,) in seeded_session.query(DCF.age)
-            .filter_by(scenario_id=scenario_id, sub_scenario_id=sub_scenario_id)
-            .all()
-        }
+        ages_in_dcf = ages_by_combo.get((scenario_id, sub_scenario_id), set())
         expected_ages = set(range(min_age, max_age + 1))
         missing = expected_ages.difference(ages_in_dcf)
         assert not missing, (
             f"Projection for scenario {scenario_id}/{sub_scenario_id} is missing ages: {sorted(missing)}"
         )
-
@@ -1,5 +1,5 @@
 import pytest
-from ..app.services.dcf_calculator import DCFCalculator
+from backend.app.services.dcf_calculator import DCFCalculator
 
 def test_calculate_present_value():
     calculator = DCFCalculator(current_age=30)
@@ -56,4 +56,19 @@ def test_different_discount_rates():
     pv_low = calculator_low.calculate_present_value(future_value, years_from_now)
     
     # Higher discount rate should result in lower present value
-    assert pv_high < pv_low 
\ No newline at end of file
+    assert pv_high < pv_low 
+
+def test_vectorised_matches_scalar():
+    calculator = DCFCalculator(current_age=30)
+    amounts = [1000, 12000, 60000]
+    years = [10, 20, 25]
+    start_years = [0, 10, 35]
+    
+    pv_vec = calculator.calculate_present_value_vec(amounts, years)
+    annuity_vec = calculator.calculate_annuity_present_value_vec(amounts, years, start_years)
+    
+    for i, amount in enumerate(amounts):
+        assert pv_vec[i] == pytest.approx(calculator.calculate_present_value(amount, years[i]))
+        assert annuity_vec[i] == pytest.approx(
+            calculator.calculate_annuity_present_value(amount, years[i], start_years[i])
+        )
@@ -1,48 +1,68 @@
 import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
-from backend.app import create_app
 from backend.app.database import db
 from backend.app.models.solved_parameter_value import SolvedParameterValue
 from backend.app.models.net_worth import MilestoneValueByAge
 from backend.app.models.milestone import Milestone
 
-# Import the helper module we want to test
-from backend.scripts.scenario_calculations_template import (
-    fetch_all_data,
-    get_session,
-    upsert_solved_parameter_values,
-    upsert_milestone_values_by_age,
-)
+# Import the helper module we want to test (successor of the old
+# scenario_calculations_template script)
+from backend.scripts.db_connector import DBConnector
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Create one in-memory database and its schema for the whole run."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    # pysqlite manages transactions itself and ignores SAVEPOINTs; hand
+    # BEGIN over to SQLAlchemy so the per-test rollback below works.
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, _connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    db.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture
-def in_memory_app():
-    """Create a throw-away Flask application backed by an in-memory SQLite DB."""
-    app = create_app()
-    app.config["TESTING"] = True
+def session(engine):
+    """Return a session inside a transaction that is rolled back after the test.
 
-    with app.app_context():
-        db.create_all()
-        yield app
-        # Clean up — remove the session/engine to not leak state between tests
-        db.session.remove()
+    Commits made by the code under test only release a SAVEPOINT, so each
+    test starts from the same database without re-running ``create_all``.
+    """
+    connection = engine.connect()
+    trans = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    trans.rollback()
+    connection.close()
 
 
 @pytest.fixture
-def session(in_memory_app):
-    """Return the SQLAlchemy session bound to the in-memory DB."""
-    return db.session
+def connector():
+    return DBConnector()
 
 
-def test_fetch_all_data_on_empty_db(session):
-    data = fetch_all_data(session)
+def test_fetch_all_data_on_empty_db(session, connector):
+    data = connector.fetch_all_data(session)
     assert data["milestones"] == []
     assert data["goals"] == []
     assert data["scenario_parameter_values"] == []
     assert data["milestone_values_by_age"] == []
 
 
-def test_upsert_solved_parameter_values(session, dummy_milestone):
+def test_upsert_solved_parameter_values(session, connector, dummy_milestone):
     record = {
         "milestone_id": dummy_milestone.id,
         "scenario_id": 1,
@@ -54,24 +74,24 @@ def test_upsert_solved_parameter_values(session, dummy_milestone):
     }
 
     # Insert
-    upsert_solved_parameter_values(session, [record])
+    connector.upsert_solved_parameter_values(session, [record])
     assert session.query(SolvedParameterValue).count() == 1
 
     # Update (same unique key but different value)
     record["solved_value"] = 250_000.0
-    upsert_solved_parameter_values(session, [record])
+    connector.upsert_solved_parameter_values(session, [record])
     assert session.query(SolvedParameterValue).one().solved_value == 250_000.0
 
 
-def test_upsert_milestone_values_by_age(session, dummy_milestone):
+def test_upsert_milestone_values_by_age(session, connector, dummy_milestone):
     record = {"milestone_id": dummy_milestone.id, "age": 40, "value": 50_000.0}
 
-    upsert_milestone_values_by_age(session, [record])
+    connector.upsert_milestone_values_by_age(session, [record])
     assert session.query(MilestoneValueByAge).count() == 1
 
     # Update the same row
     record["value"] = 55_000.0
-    upsert_milestone_values_by_age(session, [record])
+    connector.upsert_milestone_values_by_age(session, [record])
     assert session.query(MilestoneValueByAge).one().value == 55_000.0
 
 
@@ -84,6 +104,6 @@ def dummy_milestone(session):
         milestone_type="Expense",
         amount=1_000.0,
     )
-    session.add(ms)
+    session.bulk_save_objects([ms], return_defaults=True)
     session.commit()
     return ms 
\ No newline at end of file
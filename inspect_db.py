@@ -2,44 +2,97 @@ import sqlite3
 import argparse
 
 def inspect_database(inspect_table_name, inspect_row_limit):
-    conn = sqlite3.connect('instance/finance.db')
+    # Read-only: no write lock, and safe to run next to the app
+    conn = sqlite3.connect('file:instance/finance.db?mode=ro', uri=True)
     cursor = conn.cursor()
     
     # Get all tables
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
+    tables = [row[0] for row in cursor.fetchall()]
+
+    # Column lists and row counts for every table up front, in one query each
+    columns = table_columns(cursor)
+    counts, estimated = row_counts(cursor, tables)
     
     print("Tables in database:")
-    for table in tables:
-        table_name = table[0]
-        inspect_table(cursor, table_name)
+    for table_name in tables:
+        inspect_table(
+            cursor, table_name,
+            columns=columns.get(table_name),
+            count=counts.get(table_name),
+            estimated=table_name in estimated,
+        )
     
     if inspect_table_name is not None:
         inspect_table(cursor, inspect_table_name, limit=inspect_row_limit)
     
     conn.close()
 
-def inspect_table(cursor, table_name, limit=5):
+def table_columns(cursor):
+    """Return ``{table: [(name, type), ...]}`` for every table via the
+    ``pragma_table_info`` table-valued function (SQLite >= 3.16)."""
+    cursor.execute(
+        "SELECT m.name, p.name, p.type FROM sqlite_master AS m "
+        "JOIN pragma_table_info(m.name) AS p "
+        "WHERE m.type = 'table' ORDER BY m.name, p.cid;"
+    )
+    columns = {}
+    for table_name, col_name, col_type in cursor.fetchall():
+        columns.setdefault(table_name, []).append((col_name, col_type))
+    return columns
+
+def row_counts(cursor, tables):
+    """Row count per table, read from ``sqlite_stat1`` when ``ANALYZE`` has
+    populated it (the first integer of ``stat`` is the table's row count) so
+    large tables are not scanned. Tables without statistics are counted in a
+    single ``UNION ALL`` query.
+
+    Returns ``(counts, estimated)`` where *estimated* is the set of tables
+    whose count came from ``sqlite_stat1`` and is only as fresh as the last
+    ``ANALYZE``."""
+    counts = {}
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1';")
+    if cursor.fetchone():
+        cursor.execute("SELECT tbl, stat FROM sqlite_stat1;")
+        for table_name, stat in cursor.fetchall():
+            counts[table_name] = max(counts.get(table_name, 0), int(stat.split()[0]))
+    estimated = set(counts)
+
+    missing = [t for t in tables if t not in counts]
+    if missing:
+        cursor.execute(" UNION ALL ".join(
+            f"SELECT '{t}', COUNT(*) FROM {t}" for t in missing
+        ) + ";")
+        counts.update(cursor.fetchall())
+    return counts, estimated
+
+def inspect_table(cursor, table_name, limit=5, columns=None, count=None, estimated=False):
     print(f"\nTable: {table_name}")
     
     # Get table structure
-    cursor.execute(f"PRAGMA table_info({table_name});")
-    columns = cursor.fetchall()
+    if columns is None:
+        cursor.execute(f"PRAGMA table_info({table_name});")
+        columns = [(col[1], col[2]) for col in cursor.fetchall()]
     print("Columns:")
-    for col in columns:
-        print(f"  - {col[1]} ({col[2]})")
+    for col_name, col_type in columns:
+        print(f"  - {col_name} ({col_type})")
     
     # Get row count
-    cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
-    count = cursor.fetchone()[0]
-    print(f"Total rows: {count}")
+    if count is None:
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
+        count = cursor.fetchone()[0]
+    if estimated:
+        print(f"Total rows: ~{count} (estimate from the last ANALYZE)")
+    else:
+        print(f"Total rows: {count}")
     
-    # Show first few rows
-    if count > 0:
-        cursor.execute(f"SELECT * FROM {table_name} LIMIT {limit};")
-        rows = cursor.fetchall()
+    # Show first few rows; fetch them rather than trusting an estimated count
+    cursor.execute(f"SELECT * FROM {table_name} LIMIT {limit};")
+    first = cursor.fetchone()
+    if first is not None:
         print("\nFirst 5 rows:")
-        for row in rows:
+        print(f"  {first}")
+        for row in cursor:  # stream rows rather than materialising them all
             print(f"  {row}")
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
 import pygame
 import pygame.gfxdraw  # for anti-aliased circles
-import random
 import math
+from dataclasses import dataclass
+
+import numpy as np
 
 # Initialize Pygame
 pygame.init()
@@ -10,6 +12,10 @@ screen = pygame.display.set_mode((width, height))
 pygame.display.set_caption("Financial Model Simulation")
 clock = pygame.time.Clock()
 
+# Per-frame drawing target, allocated once in the display's pixel format and
+# cleared at the start of every frame
+overlay = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
+
 # Simulation parameters (tweak these to taste)
 # --------------------------------------------------
 # How many generations (node count) to keep visible at once
@@ -25,6 +31,10 @@ direction = 1
 MIN_CHILDREN = 1
 MAX_CHILDREN = 20
 
+# Soft cap on live nodes: spawns are trimmed to the remaining budget and the
+# oldest nodes are evicted early once it is reached, bounding per-frame work
+TARGET_NODES = 200
+
 # Random positional jitter around the parent
 JITTER_DISTANCE = 0
 
@@ -52,40 +62,136 @@ SPAWN_INTERVAL_FRAMES = 5
 # Attempts to find a non-overlapping child placement
 MAX_POSITION_TRIES = 25
 
-# Node structure
-class Node:
-    def __init__(self, position, section, generation, parents=None):
-        if parents is None:
-            parents = []
-        self.position = position
-        self.parents = parents
-        self.age = 0
-        self.section = section
-        self.generation = generation
-        # Growth progress for animation (0 = just born, 1 = fully grown)
-        self.growth = 0.0
-        # Fade value (1 = fully visible, 0 = invisible)
-        self.fade = 1.0
-
-nodes = []
+# Single NumPy generator for child counts and candidate positions
+rng = np.random.default_rng()
+
+# Node storage ----------------------------------------------------------------
+
+@dataclass
+class NodeArrays:
+    """Structure-of-arrays node store: row *i* holds node *i* in spawn order.
+
+    Columns are preallocated and grow geometrically.  ``parent`` holds the
+    parent's row, or -1 for the root and for nodes whose parent was pruned.
+    """
+    pos: np.ndarray         # (capacity, 2) x/y position
+    section: np.ndarray
+    generation: np.ndarray
+    parent: np.ndarray
+    growth: np.ndarray      # 0 = just born, 1 = fully grown
+    fade: np.ndarray        # 1 = fully visible, 0 = invisible
+    count: int = 0
+
+    @classmethod
+    def empty(cls, capacity=64):
+        return cls(
+            pos=np.zeros((capacity, 2)),
+            section=np.zeros(capacity, dtype=np.int64),
+            generation=np.zeros(capacity, dtype=np.int64),
+            parent=np.full(capacity, -1, dtype=np.int64),
+            growth=np.zeros(capacity),
+            fade=np.ones(capacity),
+        )
+
+    def __len__(self):
+        return self.count
+
+    def append(self, position, section, generation, parent=-1, growth=0.0):
+        """Add a node and return its row."""
+        if self.count == len(self.growth):
+            for name in ("pos", "section", "generation", "parent", "growth", "fade"):
+                arr = getattr(self, name)
+                setattr(self, name, np.concatenate([arr, np.empty_like(arr)]))
+        i = self.count
+        self.pos[i] = position
+        self.section[i] = section
+        self.generation[i] = generation
+        self.parent[i] = parent
+        self.growth[i] = growth
+        self.fade[i] = 1.0
+        self.count += 1
+        return i
+
+    def drop_front(self, k):
+        """Drop the *k* oldest nodes.  Rows are in spawn order, so pruning old
+        generations or fully faded nodes always removes a prefix."""
+        if k <= 0:
+            return
+        n = self.count - k
+        for name in ("pos", "section", "generation", "growth", "fade"):
+            arr = getattr(self, name)
+            arr[:n] = arr[k:self.count]
+        par = self.parent[k:self.count] - k
+        self.parent[:n] = np.where(par >= 0, par, -1)
+        self.count = n
+
+nodes = NodeArrays.empty()
 
 # Geometry helpers -----------------------------------------------------------
 
-def _ccw(A, B, C):
-    """Return True if the points A, B, C are listed in a counter-clockwise order."""
-    return (C[1] - A[1]) * (B[0] - A[0]) > (B[1] - A[1]) * (C[0] - A[0])
+try:  # optional JIT for the edge-crossing scan – NumPy fallback otherwise
+    from numba import njit
+except ImportError:
+    njit = None
 
-def segments_intersect(p1, p2, p3, p4):
-    """Return True if line segment p1→p2 intersects p3→p4 (excluding shared endpoints)."""
-    # Fast rejection: If any shared endpoint, we don't consider it an intersection.
-    if p1 == p3 or p1 == p4 or p2 == p3 or p2 == p4:
-        return False
-    return _ccw(p1, p3, p4) != _ccw(p2, p3, p4) and _ccw(p1, p2, p3) != _ccw(p1, p2, p4)
+def _first_intersection(ax, ay, bx, by, edges):
+    """Return True as soon as segment a→b properly crosses one of *edges*.
 
-# First root node
-root_node = Node(position=(width // 2, height // 2), section=0, generation=0)
-root_node.growth = 1.0  # root is already visible
-nodes.append(root_node)
+    Scalar loop with early exit, compiled by numba when it is installed.
+    Two segments intersect when each one's endpoints lie on opposite sides
+    (counter-clockwise vs. clockwise) of the other; shared endpoints never
+    count as an intersection.
+    """
+    for i in range(edges.shape[0]):
+        cx, cy, dx, dy = edges[i, 0], edges[i, 1], edges[i, 2], edges[i, 3]
+        if (ax == cx and ay == cy) or (ax == dx and ay == dy) or (bx == cx and by == cy) or (bx == dx and by == dy):
+            continue
+        acd = (dy - ay) * (cx - ax) > (cy - ay) * (dx - ax)
+        bcd = (dy - by) * (cx - bx) > (cy - by) * (dx - bx)
+        abc = (cy - ay) * (bx - ax) > (by - ay) * (cx - ax)
+        abd = (dy - ay) * (bx - ax) > (by - ay) * (dx - ax)
+        if acd != bcd and abc != abd:
+            return True
+    return False
+
+if njit is not None:
+    _first_intersection = njit(cache=True)(_first_intersection)
+
+def _crossing_mask(ax, ay, points, edges):
+    """Per-point flag: does segment a→point cross any of *edges*?"""
+    out = np.zeros(points.shape[0], dtype=np.bool_)
+    for i in range(points.shape[0]):
+        out[i] = _first_intersection(ax, ay, points[i, 0], points[i, 1], edges)
+    return out
+
+if njit is not None:
+    _crossing_mask = njit(cache=True)(_crossing_mask)
+
+def crossing_mask(a, points, edges):
+    """Return a bool array flagging which segments a→points[i] cross any of
+    *edges*.
+
+    *points* is a ``(P, 2)`` float array and *edges* an ``(E, 4)`` float
+    array of ``(x1, y1, x2, y2)`` rows.
+    """
+    if not len(edges):
+        return np.zeros(len(points), dtype=bool)
+    ax, ay = a
+    if njit is not None:
+        return _crossing_mask(float(ax), float(ay), points, edges)
+
+    # Without numba evaluate the same tests for every point/edge pair at once
+    bx, by = points[:, :1], points[:, 1:]
+    cx, cy, dx, dy = edges.T
+    shared = ((ax == cx) & (ay == cy)) | ((ax == dx) & (ay == dy)) | ((bx == cx) & (by == cy)) | ((bx == dx) & (by == dy))
+    acd = (dy - ay) * (cx - ax) > (cy - ay) * (dx - ax)
+    bcd = (dy - by) * (cx - bx) > (cy - by) * (dx - bx)
+    abc = (cy - ay) * (bx - ax) > (by - ay) * (cx - ax)
+    abd = (dy - ay) * (bx - ax) > (by - ay) * (dx - ax)
+    return np.any(~shared & (acd != bcd) & (abc != abd), axis=1)
+
+# First root node (already fully grown)
+nodes.append((width // 2, height // 2), section=0, generation=0, growth=1.0)
 
 def add_children():
     """Spawn children moving section-by-section across the screen.
@@ -99,8 +205,9 @@ def add_children():
     if not nodes:
         return
 
-    parent = nodes[-1]
-    parent_section = parent.section
+    parent = nodes.count - 1
+    parent_section = int(nodes.section[parent])
+    parent_pos = tuple(nodes.pos[parent].tolist())
 
     # Determine next section index, reversing at the edges
     next_section = parent_section + direction
@@ -108,87 +215,117 @@ def add_children():
         direction *= -1
         next_section = parent_section + direction
 
-    num_children = random.randint(MIN_CHILDREN, MAX_CHILDREN)
+    num_children = int(rng.integers(MIN_CHILDREN, MAX_CHILDREN, endpoint=True))
+    num_children = min(num_children, max(1, TARGET_NODES - nodes.count))
     section_width = width / SECTION_COUNT
     left_bound = next_section * section_width
     right_bound = left_bound + section_width
 
-    for _ in range(num_children):
-        for _ in range(MAX_POSITION_TRIES):
-            new_x = random.uniform(max(left_bound + SCREEN_MARGIN, left_bound),
-                                   min(right_bound - SCREEN_MARGIN, right_bound))
-            new_y = random.uniform(SCREEN_MARGIN, height - SCREEN_MARGIN)
-            candidate_pos = (new_x, new_y)
-
-            # Ensure the new edge does not intersect existing ones
-            intersects = False
-            for n in nodes:
-                for p in n.parents:
-                    if p not in nodes or p == parent:
-                        continue
-                    if segments_intersect(parent.position, candidate_pos, p.position, n.position):
-                        intersects = True
-                        break
-                if intersects:
-                    break
-            if not intersects:
-                break  # found valid location
-
-        child = Node(position=candidate_pos, section=next_section, generation=parent.generation + 1, parents=[parent])
-        nodes.append(child)
-
-    # Prune by generation rather than raw node count
-    max_gen = max(n.generation for n in nodes)
-    nodes[:] = [n for n in nodes if n.generation >= max_gen - (GENERATION_LIMIT - 1)]
+    # Existing edges (parent → node) the new ones must not cross.  Children
+    # spawned below all hang off *parent*, so the set is fixed for this call.
+    n = nodes.count
+    par = nodes.parent[:n]
+    linked = np.flatnonzero((par >= 0) & (par != parent))
+    edges = np.hstack([nodes.pos[par[linked]], nodes.pos[linked]])
+
+    # Draw every placement attempt for every child up front and screen them
+    # against the existing edges in one batch
+    low = np.array([max(left_bound + SCREEN_MARGIN, left_bound), SCREEN_MARGIN])
+    high = np.array([min(right_bound - SCREEN_MARGIN, right_bound), height - SCREEN_MARGIN])
+
+    # Only edges whose bounding box overlaps the region the new edges can
+    # occupy (parent plus the target section) are able to cross them
+    region_lo = np.minimum(np.minimum(low, high), parent_pos)
+    region_hi = np.maximum(np.maximum(low, high), parent_pos)
+    near = ((np.maximum(edges[:, 0], edges[:, 2]) >= region_lo[0])
+            & (np.minimum(edges[:, 0], edges[:, 2]) <= region_hi[0])
+            & (np.maximum(edges[:, 1], edges[:, 3]) >= region_lo[1])
+            & (np.minimum(edges[:, 1], edges[:, 3]) <= region_hi[1]))
+    edges = edges[near]
+
+    candidates = low + (high - low) * rng.random((num_children, MAX_POSITION_TRIES, 2))
+    blocked = crossing_mask(parent_pos, candidates.reshape(-1, 2), edges).reshape(num_children, MAX_POSITION_TRIES)
+
+    # Each child takes its first non-crossing attempt, or the last one if
+    # every attempt crosses an edge
+    tries = np.where(blocked.all(axis=1), MAX_POSITION_TRIES - 1, blocked.argmin(axis=1))
+    child_generation = int(nodes.generation[parent]) + 1
+    for candidate_pos in candidates[np.arange(num_children), tries]:
+        nodes.append(candidate_pos, section=next_section, generation=child_generation, parent=parent)
+
+    # Prune by generation rather than raw node count: the newest generation
+    # is the last row and generations never decrease along the rows
+    gen = nodes.generation[:nodes.count]
+    nodes.drop_front(int(np.searchsorted(gen, gen[-1] - (GENERATION_LIMIT - 1))))
+    nodes.drop_front(nodes.count - TARGET_NODES)
+
+def polylines(segments):
+    """Join an (E, 2, 2) array of segments into point lists. A segment that
+    continues from the previous end point extends the current list, and one
+    that shares the previous start point (a sibling edge) is appended by
+    stepping back to that start, so a whole fan of children becomes a single
+    polyline."""
+    chains = []
+    for start, end in segments.tolist():
+        if chains and chains[-1][-1] == start:
+            chains[-1].append(end)
+        elif chains and chains[-1][-2] == start:
+            chains[-1] += [start, end]
+        else:
+            chains.append([start, end])
+    return chains
+
+# RGBA colours for every alpha level, built once instead of per edge/node
+LINE_LUT = [(*LINE_COLOR[:3], a) for a in range(256)]
+NODE_OUTER_LUT = [(*NODE_OUTER_COLOR[:3], a) for a in range(256)]
+NODE_INNER_LUT = [(*NODE_INNER_COLOR[:3], a) for a in range(256)]
 
 def draw():
     screen.fill(BG_COLOR)
-    overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 0))
 
     # Determine which generations are still considered "alive"
-    max_gen = max(n.generation for n in nodes)
-    min_alive_gen = max_gen - (GENERATION_LIMIT - 1)
-
-    # Update growth & fade state
-    for node in nodes:
-        # Growth toward child
-        if node.growth < 1.0:
-            node.growth = min(1.0, node.growth + GROWTH_SPEED)
-
-        # Fade-out if older generation
-        if node.generation < min_alive_gen:
-            node.fade = max(0.0, node.fade - FADE_SPEED)
-        else:
-            node.fade = 1.0  # ensure fully visible if within limit
-
-    # Remove fully faded nodes
-    nodes[:] = [n for n in nodes if n.fade > 0.0]
-
-    # Draw connections first (animated & faded)
-    for node in nodes:
-        for parent in node.parents:
-            if parent in nodes:
-                # Interpolate endpoint based on growth progress
-                end_x = parent.position[0] + (node.position[0] - parent.position[0]) * node.growth
-                end_y = parent.position[1] + (node.position[1] - parent.position[1]) * node.growth
-                alpha = int(255 * min(node.fade, parent.fade))
-                color = (*LINE_COLOR[:3], alpha)
-                pygame.draw.line(overlay, color, parent.position, (end_x, end_y), 1)
+    n = nodes.count
+    gen = nodes.generation[:n]
+    min_alive_gen = gen[-1] - (GENERATION_LIMIT - 1)
+
+    # Update growth & fade state: grow toward the child, fade out older
+    # generations and keep the ones within the limit fully visible
+    growth = nodes.growth[:n]
+    growing = growth < 1.0
+    growth[growing] = np.minimum(1.0, growth[growing] + GROWTH_SPEED)
+    fade = nodes.fade[:n]
+    fade[:] = np.where(gen < min_alive_gen, np.maximum(0.0, fade - FADE_SPEED), 1.0)
+
+    # Remove fully faded nodes (older generations fade first, so they lead)
+    nodes.drop_front(int(np.count_nonzero(fade <= 0.0)))
+    n = nodes.count
+    pos, growth, fade = nodes.pos[:n], nodes.growth[:n], nodes.fade[:n]
+
+    # Draw connections first (animated & faded): interpolate every endpoint
+    # based on growth progress in one pass, then issue one polyline per run
+    # of connected edges sharing an alpha instead of one call per edge
+    rows = np.flatnonzero(nodes.parent[:n] >= 0)
+    par = nodes.parent[rows]
+    starts = pos[par]
+    ends = starts + (pos[rows] - starts) * growth[rows, None]
+    alphas = (255 * np.minimum(fade[rows], fade[par])).astype(np.uint8)
+    segments = np.stack([starts, ends], axis=1)
+    for alpha in np.unique(alphas).tolist():
+        for chain in polylines(segments[alphas == alpha]):
+            pygame.draw.lines(overlay, LINE_LUT[alpha], False, chain, 1)
 
     # Draw nodes on top using fade alpha
-    for node in nodes:
-        if node.growth >= 1.0:
-            x, y = int(node.position[0]), int(node.position[1])
-            alpha = int(255 * node.fade)
-            outer_color = (*NODE_OUTER_COLOR[:3], alpha)
-            inner_color = (*NODE_INNER_COLOR[:3], alpha)
-
-            pygame.gfxdraw.aacircle(overlay, x, y, NODE_RADIUS, outer_color)
-            pygame.gfxdraw.filled_circle(overlay, x, y, NODE_RADIUS, outer_color)
-
-            inner_r = int(NODE_RADIUS * INNER_FILL_PERCENT)
-            if inner_r > 0:
-                pygame.gfxdraw.filled_circle(overlay, x, y, inner_r, inner_color)
+    grown = growth >= 1.0
+    inner_r = int(NODE_RADIUS * INNER_FILL_PERCENT)
+    for (x, y), alpha in zip(pos[grown].astype(int).tolist(), (255 * fade[grown]).astype(np.uint8).tolist()):
+        outer_color = NODE_OUTER_LUT[alpha]
+
+        pygame.gfxdraw.aacircle(overlay, x, y, NODE_RADIUS, outer_color)
+        pygame.gfxdraw.filled_circle(overlay, x, y, NODE_RADIUS, outer_color)
+
+        if inner_r > 0:
+            pygame.gfxdraw.filled_circle(overlay, x, y, inner_r, NODE_INNER_LUT[alpha])
 
     # Blit overlay with alpha to main screen
     screen.blit(overlay, (0, 0))
@@ -1,5 +1,7 @@
+import bmesh
 import bpy
-import random
+import numpy as np
+from collections import defaultdict, deque
 from mathutils import Vector
 
 """
@@ -45,11 +47,15 @@ NODE_COLOR = (0.0, 0.8, 0.0, 1.0)      # default green RGBA
 # -----------------------------------------------------------------------------
 _EDGE_MATERIAL = None  # cached grey material for cylinders
 _NODE_MATERIAL = None  # cached green material for spheres
+_NODE_EMISSION = None  # its "Emission Strength" socket, keyframed on every flash
+_SPHERE_MESH = None    # single sphere mesh shared by every node object
+_CYLINDER_MESH = None  # unit-length cylinder shared by every edge object
+_EDGE_LIGHT_ACTION = None  # energy curve of an edge light, starting at frame 0
 
 
 def _get_node_material():
     """Create (once) and return the material used by every node sphere."""
-    global _NODE_MATERIAL
+    global _NODE_MATERIAL, _NODE_EMISSION
     if _NODE_MATERIAL is None:
         mat = bpy.data.materials.new("NodeGreen")
         mat.use_nodes = True
@@ -58,17 +64,61 @@ def _get_node_material():
         bsdf.inputs["Emission"].default_value = NODE_COLOR
         bsdf.inputs["Emission Strength"].default_value = 0.0
         _NODE_MATERIAL = mat
+        _NODE_EMISSION = bsdf.inputs["Emission Strength"]
     return _NODE_MATERIAL
 
 
-def _flash_material(mat, frame, emission_strength=10.0):
-    """Insert keyframes so `mat` emits a flash at `frame`."""
-    bsdf = mat.node_tree.nodes.get("Principled BSDF")
-    inp = bsdf.inputs["Emission Strength"]
-    inp.default_value = emission_strength
-    inp.keyframe_insert(data_path="default_value", frame=frame)
-    inp.default_value = 0.0
-    inp.keyframe_insert(data_path="default_value", frame=frame + LIGHT_FADE_FRAMES)
+def _flash_material(frame, emission_strength=10.0):
+    """Insert keyframes so the node material emits a flash at `frame`."""
+    _get_node_material()
+    _add_keyframes(_NODE_EMISSION.id_data, _NODE_EMISSION.path_from_id("default_value"),
+                   [(frame, emission_strength), (frame + LIGHT_FADE_FRAMES, 0.0)])
+
+
+def _add_keyframes(id_data, data_path, keys, index=0):
+    """Append ``(frame, value)`` *keys* to an F-curve of *id_data* in bulk.
+
+    One ``keyframe_points.add`` plus a single ``foreach_set`` replaces a
+    ``keyframe_insert`` per key, each of which re-sorts the curve and
+    recalculates its handles; ``update()`` does that once at the end.
+    """
+    anim = id_data.animation_data or id_data.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(f"{id_data.name}Action")
+    fcurve = (anim.action.fcurves.find(data_path, index=index)
+              or anim.action.fcurves.new(data_path, index=index))
+    _append_keys(fcurve, keys)
+
+
+def _append_keys(fcurve, keys):
+    """Append ``(frame, value)`` *keys* to *fcurve* with one bulk write."""
+    points = fcurve.keyframe_points
+    co = [0.0] * (2 * len(points))
+    if co:
+        points.foreach_get("co", co)
+    co.extend(c for key in keys for c in key)
+    points.add(len(keys))
+    points.foreach_set("co", co)
+    fcurve.update()
+
+
+def _get_sphere_mesh():
+    """Build (once) and return the low-poly sphere mesh shared by every node.
+
+    Built with ``bmesh`` straight into a mesh datablock, so no operator (and
+    no temporary object) is involved.  All node objects reference this one
+    mesh, which also carries the node material.
+    """
+    global _SPHERE_MESH
+    if _SPHERE_MESH is None:
+        mesh = bpy.data.meshes.new("NodeSphere")
+        bm = bmesh.new()
+        bmesh.ops.create_uvsphere(bm, u_segments=16, v_segments=8, radius=NODE_RADIUS)
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.materials.append(_get_node_material())
+        _SPHERE_MESH = mesh
+    return _SPHERE_MESH
 
 
 def _get_edge_material():
@@ -82,6 +132,24 @@ def _get_edge_material():
         _EDGE_MATERIAL = mat
     return _EDGE_MATERIAL
 
+def _get_cylinder_mesh():
+    """Build (once) and return a unit-length cylinder along +Z for the edges.
+
+    Edges reuse this mesh and encode their length in ``scale.z`` instead of
+    generating new geometry per edge.
+    """
+    global _CYLINDER_MESH
+    if _CYLINDER_MESH is None:
+        mesh = bpy.data.meshes.new("EdgeCylinder")
+        bm = bmesh.new()
+        bmesh.ops.create_cone(bm, cap_ends=True, segments=12,
+                              radius1=LINE_RADIUS, radius2=LINE_RADIUS, depth=1.0)
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.materials.append(_get_edge_material())
+        _CYLINDER_MESH = mesh
+    return _CYLINDER_MESH
+
 # ----------------------------------------------------------------------------
 # ------------------------------ Data model ----------------------------------
 # ----------------------------------------------------------------------------
@@ -100,7 +168,14 @@ class Node:
 
 
 # Global simulation state -----------------------------------------------------
-nodes = []                           # every live node
+generations = deque(maxlen=GENERATION_LIMIT)  # live nodes, one list per generation
+rng = np.random.default_rng()        # child counts and candidate positions
+
+# Spatial hash of live nodes for the overlap test.  Cells are one sphere
+# diameter wide (in pixels), so any overlapping sphere lies in the 3x3 block
+# of cells around a candidate.
+_CELL_SIZE = 2 * NODE_RADIUS / SCALE
+_spatial = defaultdict(list)         # (cell_x, cell_y) -> [Node]
 _direction = {"dir": 1}              # mutable container so closure can mutate
 
 
@@ -112,90 +187,141 @@ def pixel_to_world(pt):
     return Vector(((x - WIDTH / 2) * SCALE, (y - HEIGHT / 2) * SCALE, 0))
 
 
+def _cell(position):
+    return int(position[0] // _CELL_SIZE), int(position[1] // _CELL_SIZE)
+
+
+def _track(node: Node):
+    """Add *node* to the spatial hash."""
+    _spatial[_cell(node.position)].append(node)
+
+
+def _untrack(node: Node):
+    """Remove *node* from the spatial hash, dropping its cell once empty."""
+    key = _cell(node.position)
+    bucket = _spatial[key]
+    bucket.remove(node)
+    if not bucket:
+        del _spatial[key]
+
+
+def _overlaps(position):
+    """True if a sphere at *position* would overlap a live node's sphere."""
+    x, y = position
+    cx, cy = _cell(position)
+    for gx in (cx - 1, cx, cx + 1):
+        for gy in (cy - 1, cy, cy + 1):
+            for other in _spatial.get((gx, gy), ()):
+                ox, oy = other.position
+                if (ox - x) ** 2 + (oy - y) ** 2 < _CELL_SIZE ** 2:
+                    return True
+    return False
+
+
 # Scene helpers ---------------------------------------------------------------
 
 def clear_scene():
     """Delete every mesh object currently present (keeps cameras/lights)."""
-    bpy.ops.object.select_all(action="DESELECT")
-    for obj in bpy.data.objects:
-        if obj.type == "MESH":
-            obj.select_set(True)
-    bpy.ops.object.delete()
+    for obj in [o for o in bpy.data.objects if o.type == "MESH"]:
+        bpy.data.objects.remove(obj, do_unlink=True)
 
 
-def add_sphere(node: Node):
-    """Create a UV-sphere for **node** at the correct position.
-    Uses a low-poly sphere for performance and applies the shared green material
-    with a brief emission flash.
+def add_sphere(node: Node, collection):
+    """Create a UV-sphere for **node** at the correct position in *collection*.
+    The object is a plain ``bpy.data.objects.new`` around the cached sphere
+    mesh (no operator call per node).
     """
-    loc = pixel_to_world(node.position)
-    bpy.ops.mesh.primitive_uv_sphere_add(segments=16, ring_count=8, radius=NODE_RADIUS, location=loc)
-    node.sphere_obj = bpy.context.object
+    node.sphere_obj = bpy.data.objects.new("Node", _get_sphere_mesh())
+    node.sphere_obj.location = pixel_to_world(node.position)
+    collection.objects.link(node.sphere_obj)
+
+
+def new_generation_collection(generation):
+    """Create the collection a spawn builds its objects in.
+
+    It stays unlinked from the scene while being filled, so the objects added
+    to it trigger no depsgraph updates; linking it afterwards is a single
+    update for the whole generation.  Pruning removes it with its objects.
+    """
+    return bpy.data.collections.new(f"Generation{generation}")
+
 
-    # Material
-    mat = _get_node_material()
-    if node.sphere_obj.data.materials:
-        node.sphere_obj.data.materials[0] = mat
-    else:
-        node.sphere_obj.data.materials.append(mat)
+def _get_edge_light_action():
+    """Build (once) and return the energy animation shared by all edge lights.
 
-    # Flash
-    _flash_material(mat, bpy.context.scene.frame_current)
+    Full strength while the light travels and stays at the node, then a fade
+    out, keyed relative to frame 0.  Each spawn plays it through an NLA strip
+    starting at its own frame instead of owning a copy of the curve.
+    """
+    global _EDGE_LIGHT_ACTION
+    if _EDGE_LIGHT_ACTION is None:
+        action = bpy.data.actions.new("EdgeLightEnergy")
+        action.id_root = 'LIGHT'
+        action.use_fake_user = True
+        stay_frame = LIGHT_TRAVEL_FRAMES + LIGHT_STAY_FRAMES
+        _append_keys(action.fcurves.new("energy"), [
+            (0, LIGHT_ENERGY),
+            (LIGHT_TRAVEL_FRAMES, LIGHT_ENERGY),
+            (stay_frame, LIGHT_ENERGY),
+            (stay_frame + LIGHT_FADE_FRAMES, 0.0),
+        ])
+        _EDGE_LIGHT_ACTION = action
+    return _EDGE_LIGHT_ACTION
+
+
+def new_edge_light(frame):
+    """Create the point-light datablock shared by one spawn's edge lights.
+
+    Every edge of a spawn starts its light at the same *frame*, so they share
+    one datablock whose energy follows the common edge-light action from
+    that frame on.
+    """
+    light_data = bpy.data.lights.new(name="EdgeLight", type='POINT')
+    light_data.energy = LIGHT_ENERGY
+    light_data.shadow_soft_size = LIGHT_SIZE
+
+    track = light_data.animation_data_create().nla_tracks.new()
+    track.strips.new("EdgeLightEnergy", int(frame), _get_edge_light_action())
+    return light_data
 
 
-def add_edge(parent: Node, child: Node):
-    """Add a cylinder between *parent* and *child* (oriented end-to-end)."""
+def add_edge(parent: Node, child: Node, light_data, collection):
+    """Add a cylinder between *parent* and *child* (oriented end-to-end),
+    plus a light object using *light_data* that travels along it, both in
+    *collection*."""
     p1 = pixel_to_world(parent.position)
     p2 = pixel_to_world(child.position)
 
     vec = p2 - p1
     length = vec.length
+    direction = vec.normalized()  # zero vector when the nodes coincide
     mid = p1 + vec * 0.5
 
-    # Cylinder created aligned to +Z; rotate so +Z aligns to vec
-    bpy.ops.mesh.primitive_cylinder_add(vertices=12, radius=LINE_RADIUS, depth=length, location=mid)
-    cyl = bpy.context.object
+    # Shared unit cylinder along +Z, stretched to the edge length
+    cyl = bpy.data.objects.new("Edge", _get_cylinder_mesh())
+    cyl.location = mid
+    cyl.scale = (1.0, 1.0, length)
 
     # Align the cylinder with the edge vector
     cyl.rotation_mode = "QUATERNION"
     z_axis = Vector((0, 0, 1))
-    cyl.rotation_quaternion = z_axis.rotation_difference(vec.normalized())
-
-    # Edge material (shared)
-    mat_edge = _get_edge_material()
-    if cyl.data.materials:
-        cyl.data.materials[0] = mat_edge
-    else:
-        cyl.data.materials.append(mat_edge)
+    cyl.rotation_quaternion = z_axis.rotation_difference(direction)
+    collection.objects.link(cyl)
 
     # ----- Animated light travelling along the edge -----
     current_frame = bpy.context.scene.frame_current
-    light_data = bpy.data.lights.new(name="EdgeLight", type='POINT')
-    light_data.energy = LIGHT_ENERGY
-    light_data.shadow_soft_size = LIGHT_SIZE
     light_obj = bpy.data.objects.new("EdgeLight", light_data)
-    bpy.context.collection.objects.link(light_obj)
+    collection.objects.link(light_obj)
 
-    # Start at parent
-    light_obj.location = p1
-    light_obj.keyframe_insert(data_path="location", frame=current_frame)
-    light_data.keyframe_insert(data_path="energy", frame=current_frame)
-
-    # Travel to child
+    # Start at parent and travel to the child, stopping just before entering
+    # the sphere; the shared light data handles stay and fade
     arrival_frame = current_frame + LIGHT_TRAVEL_FRAMES
-    final_pos = p2 - norm * NODE_RADIUS * 0.8  # stop just before entering sphere
-    light_obj.location = final_pos
-    light_obj.keyframe_insert(data_path="location", frame=arrival_frame)
-    light_data.keyframe_insert(data_path="energy", frame=arrival_frame)  # still full energy
-
-    # Stay bright at the node for a while
-    stay_frame = arrival_frame + LIGHT_STAY_FRAMES
-    light_data.keyframe_insert(data_path="energy", frame=stay_frame)
+    final_pos = p2 - direction * NODE_RADIUS * 0.8
 
-    # Fade out
-    fade_frame = stay_frame + LIGHT_FADE_FRAMES
-    light_data.energy = 0
-    light_data.keyframe_insert(data_path="energy", frame=fade_frame)
+    light_obj.location = p1
+    for axis in range(3):
+        _add_keyframes(light_obj, "location",
+                       [(current_frame, p1[axis]), (arrival_frame, final_pos[axis])], index=axis)
 
     child.edge_objs.extend([cyl, light_obj])
 
@@ -204,10 +330,10 @@ def add_edge(parent: Node, child: Node):
 
 def add_children():
     """Spawn a new generation based on the last inserted node."""
-    if not nodes:
+    if not generations:
         return
 
-    parent = nodes[-1]
+    parent = generations[-1][-1]
     parent_section = parent.section
     next_section = parent_section + _direction["dir"]
 
@@ -220,44 +346,75 @@ def add_children():
     left_bound = next_section * section_width
     right_bound = left_bound + section_width
 
-    num_children = random.randint(MIN_CHILDREN, MAX_CHILDREN)
+    num_children = int(rng.integers(MIN_CHILDREN, MAX_CHILDREN, endpoint=True))
 
-    for _ in range(num_children):
-        # Pick a random, non-overlapping location (no intersection test simplification)
-        for _ in range(MAX_POSITION_TRIES):
-            new_x = random.uniform(max(left_bound + SCREEN_MARGIN, left_bound),
-                                   min(right_bound - SCREEN_MARGIN, right_bound))
-            new_y = random.uniform(SCREEN_MARGIN, HEIGHT - SCREEN_MARGIN)
-            candidate = (new_x, new_y)
-            break  # Skip segment-intersection test for brevity
+    # Every placement attempt for every child in one draw (same formula as
+    # random.uniform, so inverted bounds stay well defined)
+    low = np.array([max(left_bound + SCREEN_MARGIN, left_bound), SCREEN_MARGIN])
+    high = np.array([min(right_bound - SCREEN_MARGIN, right_bound), HEIGHT - SCREEN_MARGIN])
+    candidates = (low + (high - low) * rng.random((num_children, MAX_POSITION_TRIES, 2))).tolist()
 
-        child = Node(position=candidate, section=next_section,
-                      generation=parent.generation + 1, parents=[parent])
-        add_sphere(child)
-        add_edge(parent, child)
-        nodes.append(child)
+    frame = bpy.context.scene.frame_current
+    light_data = new_edge_light(frame)
+    spawn = new_generation_collection(parent.generation + 1)
 
-    # Prune old generations to keep the scene light-weight
-    max_gen = max(n.generation for n in nodes)
-    obsolete = [n for n in nodes if n.generation < max_gen - (GENERATION_LIMIT - 1)]
+    children = []
+    for tries in candidates:
+        # First attempt whose sphere does not overlap a live node (segment
+        # intersection is still skipped for brevity); the last one otherwise
+        candidate = tuple(next((pos for pos in tries if not _overlaps(pos)), tries[-1]))
 
-    bpy.ops.object.select_all(action="DESELECT")
+        child = Node(position=candidate, section=next_section,
+                      generation=parent.generation + 1, parents=[parent])
+        add_sphere(child, spawn)
+        add_edge(parent, child, light_data, spawn)
+        _track(child)
+        children.append(child)
+
+    # One depsgraph update for the whole generation, and one flash (every
+    # sphere shares the material, so per-child flashes would only re-key it)
+    bpy.context.collection.children.link(spawn)
+    _flash_material(frame)
+
+    # Appending to the full deque evicts the oldest generation, which keeps
+    # the scene light-weight; take hold of it first to delete its objects
+    obsolete = generations[0] if len(generations) == generations.maxlen else []
+    generations.append(children)
+
+    # Remove the datablocks directly: no selection changes, no operator.
+    # The generation's edge lights share one light datablock, dropped last.
+    obsolete_collection = obsolete[0].sphere_obj.users_collection[0] if obsolete else None
+    obsolete_lights = set()
     for n in obsolete:
+        _untrack(n)
         if n.sphere_obj:
-            n.sphere_obj.select_set(True)
+            bpy.data.objects.remove(n.sphere_obj, do_unlink=True)
         for edge in n.edge_objs:
-            edge.select_set(True)
-    if obsolete:
-        bpy.ops.object.delete()
-        nodes[:] = [n for n in nodes if n not in obsolete]
+            if edge.type == "LIGHT":
+                obsolete_lights.add(edge.data)
+            bpy.data.objects.remove(edge, do_unlink=True)
+    for light_data in obsolete_lights:
+        bpy.data.lights.remove(light_data)
+    if obsolete_collection is not None:
+        bpy.data.collections.remove(obsolete_collection)
 
 
 # Animation handler -----------------------------------------------------------
 
+_next_spawn_frame = SPAWN_INTERVAL_FRAMES  # next frame on which add_children runs
+
+
 def frame_change_handler(scene):
+    global _next_spawn_frame
     frame = scene.frame_current
-    if frame % SPAWN_INTERVAL_FRAMES == 0:
+    if _next_spawn_frame - SPAWN_INTERVAL_FRAMES < frame < _next_spawn_frame:
+        return  # between two spawns: one chained compare, no modulo
+
+    # Due, or playback jumped / looped: re-align on the interval grid
+    _next_spawn_frame = -(-frame // SPAWN_INTERVAL_FRAMES) * SPAWN_INTERVAL_FRAMES
+    if frame == _next_spawn_frame:
         add_children()
+        _next_spawn_frame += SPAWN_INTERVAL_FRAMES
 
 
 # Registration helpers --------------------------------------------------------
@@ -278,8 +435,12 @@ def main():
 
     # Root node at the centre
     root = Node(position=(WIDTH // 2, HEIGHT // 2), section=0, generation=0)
-    add_sphere(root)
-    nodes.append(root)
+    spawn = new_generation_collection(0)
+    add_sphere(root, spawn)
+    bpy.context.collection.children.link(spawn)
+    _flash_material(bpy.context.scene.frame_current)
+    _track(root)
+    generations.append([root])
 
     register_handler()
     print("Landing-page Blender visualisation initialised (press play to watch)")
@@ -1,42 +1,52 @@
 from backend.app import create_app
 from backend.app.database import db
-from backend.app.models.milestone import Milestone, ParentMilestone
+from backend.app.models.milestone import ParentMilestone
+from datetime import datetime
 from sqlalchemy import text
 
+ORPHAN_FILTER = "parent_milestone_id IS NULL OR parent_milestone_id = 0"
+
 def migrate_database():
     app = create_app()
     with app.app_context():
-        # Drop existing tables to ensure clean migration
-        db.drop_all()
-        
-        # Create tables
+        # Create any missing tables; existing tables and data are left alone
         db.create_all()
         
-        # Drop existing sequence if it exists
-        db.session.execute(text("DROP SEQUENCE IF EXISTS parent_milestone_id_seq"))
-        db.session.commit()
+        # SQLite has no sequences; on Postgres keep the high-range sequence
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute(text("CREATE SEQUENCE IF NOT EXISTS parent_milestone_id_seq START 1000000"))
+            db.session.commit()
         
-        # Create the sequence starting from 1000000
-        db.session.execute(text("CREATE SEQUENCE parent_milestone_id_seq START 1000000"))
-        db.session.commit()
+        # Create parent milestones for existing milestones in the database.
+        # Raw SQL bypasses the before_insert listener, so number the new
+        # parents from the current high-range maximum, in milestone ID order.
+        # On SQLite, ROW_NUMBER() needs 3.25+ and UPDATE ... FROM needs 3.33+.
+        base_id = db.session.execute(text(
+            "SELECT COALESCE(MAX(id), 999999) FROM parent_milestones WHERE id >= 1000000"
+        )).scalar()
+        db.session.execute(text(f"""
+            INSERT INTO parent_milestones (id, name, min_age, max_age, created_at, updated_at)
+            SELECT :base_id + ROW_NUMBER() OVER (ORDER BY id), name,
+                   age_at_occurrence, age_at_occurrence, :now, :now
+            FROM milestones
+            WHERE {ORPHAN_FILTER}
+        """), {"base_id": base_id, "now": datetime.utcnow()})
         
-        # Get all milestones
-        milestones = Milestone.query.all()
+        # Point the milestones at their parents using the same numbering
+        db.session.execute(text(f"""
+            UPDATE milestones
+            SET parent_milestone_id = numbered.parent_id
+            FROM (
+                SELECT id, :base_id + ROW_NUMBER() OVER (ORDER BY id) AS parent_id
+                FROM milestones
+                WHERE {ORPHAN_FILTER}
+            ) AS numbered
+            WHERE milestones.id = numbered.id
+        """), {"base_id": base_id})
         
-        # Create parent milestones for existing milestones
-        for milestone in milestones:
-            if not milestone.parent_milestone_id:
-                # Create a parent milestone using the sequence
-                parent = ParentMilestone(
-                    name=milestone.name,
-                    min_age=milestone.age_at_occurrence,
-                    max_age=milestone.age_at_occurrence
-                )
-                db.session.add(parent)
-                db.session.flush()  # Get the parent ID
-                
-                # Update the milestone to reference the parent
-                milestone.parent_milestone_id = parent.id
+        # The listener's in-process counter no longer reflects the table
+        if hasattr(ParentMilestone, "_next_high_id"):
+            del ParentMilestone._next_high_id
         
         # Commit all changes
         db.session.commit()